@@ -0,0 +1,204 @@
+%%writefile batch_runner.py
+import argparse
+import hashlib
+import json
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+import pandas as pd
+import torch
+from synthgen import write_records
+from engines import ENGINES, make_engine
+from ingest import scan_dataset
+from model_registry import BACKENDS, DEFAULT_BACKEND, DEFAULT_MODEL
+from telemetry import RunTelemetry, capture_profile
+from worker_pool import GenerationPool, shard_seed
+
+MANIFEST = "manifest.json"
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def load_manifest(output_dir, settings):
+    path = os.path.join(output_dir, MANIFEST)
+    if not os.path.exists(path):
+        return {"settings": settings, "shards": {}}
+    with open(path) as f:
+        manifest = json.load(f)
+    if manifest["settings"] != settings:
+        raise SystemExit(f"❌ {path} was written with different settings; use a new --output directory")
+    return manifest
+
+def save_manifest(output_dir, manifest):
+    path = os.path.join(output_dir, MANIFEST)
+    with open(path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+def shard_path(output_dir, index, fmt):
+    return os.path.join(output_dir, f"part-{index:05d}.{fmt}")
+
+def next_shard(manifest, target_rows, shard_size, in_flight=None):
+    in_flight = in_flight or {}
+    planned = sum(s["rows"] for s in manifest["shards"].values()) + sum(in_flight.values())
+    if planned >= target_rows:
+        return None
+    index = max([int(i) for i in manifest["shards"]] + list(in_flight), default=-1) + 1
+    return index, min(shard_size, target_rows - planned)
+
+class Progress:
+    def __init__(self, target_rows, done_rows):
+        self.target_rows = target_rows
+        self.start_rows = done_rows
+        self.done_rows = done_rows
+        self.start = time.perf_counter()
+
+    def update(self, rows):
+        self.done_rows += rows
+        elapsed = time.perf_counter() - self.start
+        rate = (self.done_rows - self.start_rows) / elapsed if elapsed > 0 else 0.0
+        remaining = self.target_rows - self.done_rows
+        eta = time.strftime("%H:%M:%S", time.gmtime(remaining / rate)) if rate > 0 else "--:--:--"
+        print(f"⏱️ {self.done_rows}/{self.target_rows} rows | {rate:.2f} rows/s | ETA {eta}", flush=True)
+
+def save_shard(records, index, output_dir, fmt):
+    final = shard_path(output_dir, index, fmt)
+    written = write_records(records, final + ".tmp", fmt=fmt)
+    if written:
+        os.replace(final + ".tmp", final)
+    return written
+
+def run_shard(engine, index, rows, output_dir, fmt, progress, seed=None, telemetry=None):
+    stats = {}
+
+    def records():
+        for frame in engine.iter_frames(rows, seed=seed, stats=stats):
+            progress.update(len(frame))
+            yield frame
+
+    written = save_shard(records(), index, output_dir, fmt)
+    if telemetry is not None and "telemetry" in stats:
+        telemetry.merge(stats["telemetry"])
+    return written
+
+def merge_shards(output_dir, manifest, merged_path, fmt):
+    files = [shard_path(output_dir, int(i), fmt) for i, s in sorted(manifest["shards"].items(), key=lambda kv: int(kv[0])) if s["rows"]]
+
+    def frames():
+        for path in files:
+            yield (pd.read_parquet(path) if fmt == "parquet" else pd.read_csv(path)).to_dict("records")
+
+    return write_records(frames(), merged_path)
+
+def _finish_shard(manifest, output_dir, index, rows, written, streak):
+    manifest["shards"][str(index)] = {"rows": written}
+    save_manifest(output_dir, manifest)
+    print(f"💾 Shard {index}: {written}/{rows} rows", flush=True)
+    streak = streak + 1 if written == 0 else 0
+    if streak >= 3:
+        raise SystemExit("❌ Three consecutive shards produced no valid rows; giving up")
+    return streak
+
+def run(input_csv, target_rows, output_dir, shard_size=1000, fmt="csv", model_name=DEFAULT_MODEL, batch_size=8,
+        records_per_prompt=1, max_new_tokens=None, threads=None, merge=None, workers=1, seed=None,
+        backend=DEFAULT_BACKEND, constrained=False, report=None, memorization=None, engine="llm"):
+    os.makedirs(output_dir, exist_ok=True)
+    telemetry = RunTelemetry()
+    settings = {"input_sha256": file_sha256(input_csv), "shard_size": shard_size, "format": fmt,
+                "model": model_name, "backend": backend, "records_per_prompt": records_per_prompt, "seed": seed,
+                "constrained": constrained, "batch_size": batch_size, "max_new_tokens": max_new_tokens,
+                "memorization": memorization, "engine": engine}
+    manifest = load_manifest(output_dir, settings)
+    source = scan_dataset(input_csv, seed=seed)
+    gen_kwargs = {"model_name": model_name, "backend": backend, "batch_size": batch_size,
+                  "records_per_prompt": records_per_prompt, "max_new_tokens": max_new_tokens, "constrained": constrained,
+                  "memorization": memorization}
+    done = sum(s["rows"] for s in manifest["shards"].values())
+    if done:
+        print(f"🔁 Resuming: {len(manifest['shards'])} shards / {done} rows already done", flush=True)
+    progress = Progress(target_rows, done)
+    streak = 0
+    if workers <= 1:
+        if threads:
+            torch.set_num_threads(threads)
+        generator = make_engine(engine, source, **gen_kwargs)
+        while (shard := next_shard(manifest, target_rows, shard_size)) is not None:
+            index, rows = shard
+            written = run_shard(generator, index, rows, output_dir, fmt, progress, shard_seed(seed, index), telemetry)
+            streak = _finish_shard(manifest, output_dir, index, rows, written, streak)
+    else:
+        in_flight = {}
+        futures = {}
+        with GenerationPool(source, workers, threads, engine=engine, **gen_kwargs) as pool:
+            while True:
+                while len(futures) < 2 * workers and (shard := next_shard(manifest, target_rows, shard_size, in_flight)):
+                    index, rows = shard
+                    in_flight[index] = rows
+                    futures[pool.submit(index, rows, shard_seed(seed, index))] = index
+                if not futures:
+                    break
+                finished, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    index = futures.pop(future)
+                    rows = in_flight.pop(index)
+                    result = future.result()
+                    records = result["records"]
+                    telemetry.merge(result["telemetry"])
+                    written = save_shard([records], index, output_dir, fmt) if records else 0
+                    progress.update(written)
+                    streak = _finish_shard(manifest, output_dir, index, rows, written, streak)
+    if merge:
+        merged = merge_shards(output_dir, manifest, merge, fmt)
+        print(f"📦 Merged {merged} rows into {merge}", flush=True)
+    if report:
+        # Stage seconds are summed over workers, so with --workers > 1 they can exceed elapsed time
+        telemetry.finish().write_json(report)
+        print(f"📝 Run report written to {report}", flush=True)
+    return manifest
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic rows in resumable shards, outside Streamlit")
+    parser.add_argument("input_csv")
+    parser.add_argument("--rows", type=int, required=True, help="target number of synthetic rows")
+    parser.add_argument("--output", required=True, help="directory for shards and the checkpoint manifest")
+    parser.add_argument("--shard-size", type=int, default=1000)
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--model", default=DEFAULT_MODEL, help="checkpoint name/path, or large/base/small")
+    parser.add_argument("--backend", choices=BACKENDS, default=DEFAULT_BACKEND)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--records-per-prompt", type=int, default=1)
+    parser.add_argument("--max-new-tokens", type=int, default=None)
+    parser.add_argument("--constrained", action="store_true", help="force the record format while decoding")
+    parser.add_argument("--engine", choices=list(ENGINES), default="llm",
+                        help="llm: the language model writes every column; statistical: Gaussian copula; "
+                             "hybrid: copula plus the language model for free-text columns")
+    parser.add_argument("--memorization", choices=["reject", "flag"], default=None,
+                        help="drop (or only count) records that copy a row of the input")
+    parser.add_argument("--workers", type=int, default=1, help="generation processes, each with its own model copy")
+    parser.add_argument("--threads", type=int, default=None, help="torch intra-op threads (per worker)")
+    parser.add_argument("--seed", type=int, default=None, help="base seed; each shard gets its own sub-seed")
+    parser.add_argument("--merge", default=None, help="also write all shards into this single file")
+    parser.add_argument("--report", default=None, help="write per-stage timings and counters to this JSON file")
+    parser.add_argument("--profile", choices=["cprofile", "torch"], default=None,
+                        help="profile this process (use with --workers 1); written to --profile-output")
+    parser.add_argument("--profile-output", default=None)
+    args = parser.parse_args(argv)
+    logging.getLogger("synthgen").setLevel(logging.ERROR)
+    logging.getLogger("engines").setLevel(logging.ERROR)
+    profile_output = args.profile_output or os.path.join(
+        args.output, "profile.prof" if args.profile == "cprofile" else "trace.json")
+    os.makedirs(args.output, exist_ok=True)
+    with capture_profile(args.profile, profile_output):
+        run(args.input_csv, args.rows, args.output, args.shard_size, args.format, args.model, args.batch_size,
+            args.records_per_prompt, args.max_new_tokens, args.threads, args.merge, args.workers, args.seed,
+            args.backend, args.constrained, args.report, args.memorization, args.engine)
+    if args.profile:
+        print(f"🔬 Profile written to {profile_output}", flush=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,495 @@
+%%writefile bench.py
+import argparse
+import itertools
+import json
+import logging
+import os
+import platform
+import random
+import re
+import statistics
+import string
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+import torch
+import synthgen
+from engines import ENGINES, StatisticalEngine, make_engine
+from ingest import scan_dataset
+from metrics import compute_report
+from schema import infer_schema
+from validation import ColumnarValidator, frame_records
+from model_registry import BACKENDS, DEFAULT_MODEL, get_model, model_nbytes, registry
+from worker_pool import GenerationPool, shard_seed
+
+def bench_batch_sizes(df, model_name=DEFAULT_MODEL, batch_sizes=(1, 2, 4, 8, 16, 32, 64), num_samples=64):
+    get_model(model_name)  # keep model loading out of the timings
+    rows = []
+    for batch_size in batch_sizes:
+        start = time.perf_counter()
+        out = synthgen.generate_synthetic_data(df.copy(), num_samples, model_name=model_name, batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+        rows.append({
+            "batch_size": batch_size,
+            "records": len(out),
+            "seconds": round(elapsed, 2),
+            "records_per_sec": round(len(out) / elapsed, 2),
+        })
+        print(rows[-1], flush=True)
+    return pd.DataFrame(rows)
+
+def bench_records_per_prompt(df, model_name=DEFAULT_MODEL, ks=(1, 2, 4, 8), num_samples=64, batch_size=8, max_new_tokens=None):
+    get_model(model_name)
+    rows = []
+    for k in ks:
+        stats = {}
+        start = time.perf_counter()
+        out = synthgen.generate_synthetic_data(df.copy(), num_samples, model_name=model_name, batch_size=batch_size,
+                                               records_per_prompt=k, max_new_tokens=max_new_tokens, stats=stats)
+        elapsed = time.perf_counter() - start
+        rows.append({
+            "records_per_prompt": k,
+            "records": len(out),
+            "calls": stats.get("calls", 0),
+            "tokens_per_record": round(stats.get("output_tokens", 0) / max(len(out), 1), 1),
+            "records_per_call": round(len(out) / max(stats.get("calls", 0), 1), 2),
+            "hit_token_limit": stats.get("hit_token_limit", 0),
+            "records_per_sec": round(len(out) / elapsed, 2),
+        })
+        print(rows[-1], flush=True)
+    return pd.DataFrame(rows)
+
+def bench_worker_scaling(df, model_name=DEFAULT_MODEL, worker_counts=(1, 2, 4, 8), num_samples=64, batch_size=8, seed=0):
+    rows = []
+    for workers in worker_counts:
+        with GenerationPool(df, workers, model_name=model_name, batch_size=batch_size) as pool:
+            for future in [pool.submit(-1 - i, 0) for i in range(workers)]:
+                future.result()  # spawn every worker and load its model before timing
+            shard = -(-num_samples // workers)
+            start = time.perf_counter()
+            futures = [pool.submit(i, min(shard, num_samples - i * shard), shard_seed(seed, i)) for i in range(workers)]
+            results = [f.result() for f in futures]
+            elapsed = time.perf_counter() - start
+        records = sum(len(r["records"]) for r in results)
+        rows.append({
+            "workers": workers,
+            "records": records,
+            "seconds": round(elapsed, 2),
+            "records_per_sec": round(records / elapsed, 2),
+            "peak_rss_mib_per_worker": round(max(r["peak_rss"] for r in results) / 2**20, 1),
+        })
+        print(rows[-1], flush=True)
+    return pd.DataFrame(rows)
+
+def bench_backends(df, model_names=(DEFAULT_MODEL,), backends=BACKENDS, num_samples=32, batch_size=8):
+    rows = []
+    for model_name in model_names:
+        for backend in backends:
+            registry.clear()
+            start = time.perf_counter()
+            try:
+                _, model = get_model(model_name, backend=backend)
+            except ValueError as e:
+                print(f"skipping {model_name} [{backend}]: {e}", flush=True)
+                continue
+            load_seconds = time.perf_counter() - start
+            stats = {}
+            start = time.perf_counter()
+            out = synthgen.generate_synthetic_data(df.copy(), num_samples, model_name=model_name, backend=backend,
+                                                   batch_size=batch_size, stats=stats)
+            elapsed = time.perf_counter() - start
+            rows.append({
+                "model": model_name,
+                "backend": registry.loaded()[-1]["backend"],
+                "load_seconds": round(load_seconds, 2),
+                "model_mib": round(model_nbytes(model) / 2**20, 1),
+                "seconds_per_call": round(elapsed / max(stats.get("calls", 0), 1), 3),
+                "records_per_sec": round(len(out) / elapsed, 2),
+                "success_rate": round(len(out) / max(stats.get("prompts", 0), 1), 3),
+            })
+            print(rows[-1], flush=True)
+    result = pd.DataFrame(rows)
+    baseline = result[result["backend"] == "fp32"].head(1)
+    if not baseline.empty:
+        base = baseline.iloc[0]
+        result["speedup_vs_fp32"] = (base["seconds_per_call"] / result["seconds_per_call"]).round(2)
+        result["memory_vs_fp32"] = (result["model_mib"] / base["model_mib"]).round(2)
+        result["success_vs_fp32"] = (result["success_rate"] - base["success_rate"]).round(3)
+    return result
+
+def bench_constrained(df, model_name=DEFAULT_MODEL, num_samples=32, batch_size=8, records_per_prompt=1):
+    get_model(model_name)
+    rows = []
+    for constrained in (False, True):
+        stats = {}
+        start = time.perf_counter()
+        out = synthgen.generate_synthetic_data(df.copy(), num_samples, model_name=model_name, batch_size=batch_size,
+                                               records_per_prompt=records_per_prompt, constrained=constrained, stats=stats)
+        elapsed = time.perf_counter() - start
+        generated = sum(call["segments"] for call in stats["per_call"])
+        rows.append({
+            "constrained": constrained,
+            "records": len(out),
+            "generated": generated,
+            "rejected": generated - len(out),
+            "accept_ratio": round(len(out) / max(generated, 1), 3),
+            "records_per_sec": round(len(out) / elapsed, 2),
+        })
+        print(rows[-1], flush=True)
+    return pd.DataFrame(rows)
+
+def bench_engines(df, engines=tuple(ENGINES), model_name=DEFAULT_MODEL, num_samples=64, batch_size=8, seed=0):
+    """records/sec per generation engine, each scored by the same evaluator report against the input."""
+    if set(engines) - {"statistical"}:
+        get_model(model_name)
+    rows = []
+    for name in engines:
+        stats = {}
+        start = time.perf_counter()
+        engine = make_engine(name, df.copy(), model_name=model_name, batch_size=batch_size)
+        fit_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        frames = list(engine.iter_frames(num_samples, seed=seed, stats=stats))
+        elapsed = time.perf_counter() - start
+        out = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=df.columns)
+        report = compute_report(df, out)
+        rows.append({
+            "engine": name,
+            "records": len(out),
+            "fit_seconds": round(fit_seconds, 2),
+            "records_per_sec": round(len(out) / elapsed, 2),
+            "average_score": report["average_score"],
+            "correlation_similarity": report["correlation"]["similarity"],
+            "dcr_median": report["dcr"]["median"] if report["dcr"] else None,
+        })
+        print(rows[-1], flush=True)
+    return pd.DataFrame(rows)
+
+def _legacy_parse(text, column_types):
+    # parse_generated_text as it was before RecordParser, kept as the baseline
+    text = re.sub(r"\s+", " ", text.strip())
+    matches = re.findall(r'([\w\s]+):\s*([^;]+)', text)
+    if not matches:
+        return None
+    record = {}
+    expected_titles = [c.replace('_', ' ').title() for c in column_types]
+    for key, val in matches:
+        key_clean = key.strip().title()
+        matched = next((c for c in expected_titles if key_clean.lower() in c.lower()), None)
+        if matched:
+            actual_key = matched.replace(" ", "_").lower()
+            typ = column_types[actual_key]
+            try:
+                val = val.replace("$", "").replace(",", "").strip()
+                if not val or val.lower() == 'nan':
+                    return None
+                record[actual_key] = int(float(val)) if typ == int else float(val) if typ == float else str(val.strip())
+            except:
+                return None
+    return record if record else None
+
+def recorded_outputs(column_types, num_texts=10000, seed=0):
+    # Stand-in for recorded model outputs: well-formed "Field: value; ..." lines for the given schema
+    rng = random.Random(seed)
+    values = {int: lambda: str(rng.randint(0, 10**6)), float: lambda: f"${rng.uniform(0, 1e4):,.2f}",
+              str: lambda: rng.choice(["Radiology", "Cardiac MRI", "Yes", "No", "Outpatient"])}
+    return ["; ".join(f"{col.replace('_', ' ').title()}: {values[typ]()}" for col, typ in column_types.items())
+            for _ in range(num_texts)]
+
+def wide_schema_outputs(num_columns=50, num_texts=10000, seed=0):
+    types = [int, float, str]
+    column_types = {f"field_{i}_{types[i % 3].__name__}": types[i % 3] for i in range(num_columns)}
+    return column_types, recorded_outputs(column_types, num_texts, seed)
+
+def bench_parse(num_columns=50, num_texts=10000):
+    column_types, texts = wide_schema_outputs(num_columns, num_texts)
+    rows = []
+    start = time.perf_counter()
+    legacy = [_legacy_parse(text, column_types) for text in texts]
+    rows.append({"parser": "legacy", "seconds": time.perf_counter() - start})
+    start = time.perf_counter()
+    parser = synthgen.RecordParser(column_types)
+    parsed = parser.parse_batch(texts)
+    rows.append({"parser": "RecordParser", "seconds": time.perf_counter() - start})
+    assert parsed == legacy
+    for row in rows:
+        row["records_per_sec"] = round(num_texts / row["seconds"], 1)
+        row["seconds"] = round(row["seconds"], 3)
+    return pd.DataFrame(rows)
+
+def _legacy_column_types(df):
+    # load_csv_data's per-element inference before schema.infer_schema, kept as the baseline
+    column_types = {}
+    for col in df.columns:
+        col_data = df[col].dropna()
+        if col_data.empty:
+            column_types[col] = str
+            continue
+        try:
+            pd.to_numeric(col_data)
+            column_types[col] = int if all(col_data.apply(lambda x: float(x).is_integer())) else float
+        except:
+            column_types[col] = str
+    return column_types
+
+def wide_frame(num_rows=1_000_000, num_columns=50, seed=0):
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for i in range(num_columns):
+        kind = i % 5
+        if kind == 0:
+            columns[f"int_{i}"] = rng.integers(0, 10**6, num_rows)
+        elif kind == 1:
+            columns[f"float_{i}"] = rng.normal(1000, 250, num_rows).round(2)
+        elif kind == 2:
+            columns[f"whole_float_{i}"] = rng.integers(0, 500, num_rows).astype(float)
+        elif kind == 3:
+            columns[f"numeric_text_{i}"] = rng.integers(0, 1000, num_rows).astype(str)
+        else:
+            columns[f"text_{i}"] = rng.choice(["Radiology", "Cardiology", "Oncology", "Yes", "No"], num_rows)
+    return pd.DataFrame(columns)
+
+def bench_schema(num_rows=1_000_000, num_columns=50, sample_rows=100_000, legacy=True):
+    df = wide_frame(num_rows, num_columns)
+    rows = []
+    timings = []
+    if legacy:
+        timings.append(("legacy per-element", lambda: _legacy_column_types(df)))
+    timings += [
+        ("infer_schema", lambda: infer_schema(df).column_types),
+        (f"infer_schema (sample {sample_rows})", lambda: infer_schema(df, sample_rows=sample_rows).column_types),
+    ]
+    reference = None
+    for name, fn in timings:
+        start = time.perf_counter()
+        column_types = fn()
+        rows.append({"method": name, "seconds": round(time.perf_counter() - start, 3),
+                     "matches_first": reference is None or column_types == reference})
+        reference = reference or column_types
+        print(rows[-1], flush=True)
+    return pd.DataFrame(rows)
+
+def build_tiny_model(path, corpus, seed=0):
+    """Save a randomly initialised 2-layer T5 with a small BPE tokenizer, for offline end-to-end runs."""
+    from tokenizers import Tokenizer, decoders, models, pre_tokenizers, processors, trainers
+    from transformers import PreTrainedTokenizerFast, T5Config, T5ForConditionalGeneration
+    tokenizer = Tokenizer(models.BPE(unk_token="<unk>"))
+    tokenizer.pre_tokenizer = pre_tokenizers.Metaspace()
+    tokenizer.decoder = decoders.Metaspace()
+    trainer = trainers.BpeTrainer(vocab_size=512, special_tokens=["<pad>", "</s>", "<unk>"],
+                                  initial_alphabet=list(string.printable))
+    tokenizer.train_from_iterator(corpus, trainer)
+    tokenizer.post_processor = processors.TemplateProcessing(single="$A </s>", special_tokens=[("</s>", 1)])
+    fast = PreTrainedTokenizerFast(tokenizer_object=tokenizer, pad_token="<pad>", eos_token="</s>", unk_token="<unk>")
+    fast.save_pretrained(path)
+    torch.manual_seed(seed)
+    config = T5Config(vocab_size=len(fast), d_model=32, d_kv=8, d_ff=64, num_layers=2, num_heads=4,
+                      decoder_start_token_id=0, pad_token_id=0, eos_token_id=1)
+    T5ForConditionalGeneration(config).save_pretrained(path)
+    return path
+
+def replay_outputs(texts):
+    """generate_texts stand-in that replays recorded outputs, to time everything around the model."""
+    replay = itertools.cycle(texts)
+
+    def generate_texts(tokenizer, model, prompts, max_new_tokens=128, stats=None, *args, **kwargs):
+        if stats is not None:
+            stats["calls"] = stats.get("calls", 0) + 1
+            stats["prompts"] = stats.get("prompts", 0) + len(prompts)
+        return [next(replay) for _ in prompts]
+    return generate_texts
+
+def _time(fn, repeat, setup=None):
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return min(times), statistics.median(times), result
+
+def bench_suite(rows=100_000, columns=20, texts=5000, samples=16, gen_columns=5, repeat=3, model_name=None, seed=0):
+    """Offline suite: synthetic CSV input, a tiny local model (or model_name), recorded outputs."""
+    results = {}
+    model_label = model_name or "tiny-t5 (random init)"
+    with tempfile.TemporaryDirectory() as tmp:
+        df = wide_frame(rows, columns, seed)
+        csv_path = os.path.join(tmp, "input.csv")
+        df.to_csv(csv_path, index=False)
+        df = pd.read_csv(csv_path)
+        column_types = infer_schema(df).column_types
+        outputs = recorded_outputs(column_types, texts, seed)
+
+        def record(name, units, unit, fn, setup=None):
+            best, median, value = _time(fn, repeat, setup)
+            results[name] = {"seconds": round(best, 4), "median_seconds": round(median, 4), "units": units,
+                             "unit": unit, "per_sec": round(units / best, 2) if best else None}
+            print(name, results[name], flush=True)
+            return value
+
+        record("scan_dataset", rows, "rows", lambda: scan_dataset(csv_path, seed=seed))
+        record("load_csv_data", rows, "rows", lambda: synthgen.load_csv_data(df.copy(), rng=np.random.default_rng(seed)))
+        parsed = record("parse_generated_text", texts, "records",
+                        lambda: synthgen.RecordParser(column_types).parse_batch(outputs))
+        DynamicModel = synthgen.create_dynamic_model(column_types)
+        record("validate_record", texts, "records",
+               lambda: [synthgen.validate_record(p, DynamicModel) for p in parsed])
+        validator = ColumnarValidator(column_types, lambda p: synthgen.check_record(p, DynamicModel))
+        record("validate_batch (columnar)", texts, "records", lambda: frame_records(validator.validate(parsed)[0]))
+
+        gen_df = df.iloc[:, :gen_columns]
+        gen_types = {col: column_types[col] for col in gen_df.columns}
+        model_name = model_name or build_tiny_model(os.path.join(tmp, "tiny-t5"), recorded_outputs(gen_types, 200, seed))
+        get_model(model_name)
+        generated = record("generate_synthetic_data", samples, "records",
+                           lambda: synthgen.generate_synthetic_data(gen_df, samples, model_name=model_name, batch_size=8,
+                                                                    constrained=True, max_new_tokens=256, seed=seed))
+        results["generate_synthetic_data"]["records"] = len(generated)
+        real_generate = synthgen.generate_texts
+        synthgen.generate_texts = replay_outputs(recorded_outputs(gen_types, 1000, seed))
+        try:
+            record("generate_synthetic_data (replayed outputs)", samples * 10, "records",
+                   lambda: synthgen.generate_synthetic_data(gen_df, samples * 10, model_name=model_name, batch_size=8,
+                                                            seed=seed))
+        finally:
+            synthgen.generate_texts = real_generate
+        engine = record("StatisticalEngine (fit)", rows, "rows", lambda: StatisticalEngine(df, column_types, seed=seed))
+        record("StatisticalEngine (sample)", rows * 10, "records",
+               lambda: sum(len(frame) for frame in engine.iter_frames(rows * 10, seed=seed)))
+        synthetic = wide_frame(max(rows // 10, 1), columns, seed + 1)
+        synthetic.columns = df.columns
+        record("evaluate (compute_report)", rows, "rows", lambda: compute_report(df, synthetic, schema=column_types))
+    return {
+        "config": {"rows": rows, "columns": columns, "texts": texts, "samples": samples, "gen_columns": gen_columns,
+                   "repeat": repeat, "seed": seed, "model": model_label},
+        "environment": {"python": platform.python_version(), "torch": torch.__version__, "cpu_count": os.cpu_count(),
+                        "platform": platform.platform()},
+        "results": results,
+    }
+
+def compare_results(current, baseline, tolerance=0.2):
+    """Rows per benchmark with the slowdown against a baseline run; regressed = slower by more than tolerance."""
+    rows = []
+    for name, result in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        ratio = result["seconds"] / before["seconds"] if before and before["seconds"] else None
+        rows.append({"benchmark": name, "seconds": result["seconds"],
+                     "baseline_seconds": before["seconds"] if before else None,
+                     "ratio": round(ratio, 3) if ratio else None,
+                     "regressed": bool(ratio and ratio > 1 + tolerance)})
+    return pd.DataFrame(rows)
+
+def _int_list(value):
+    return [int(v) for v in value.split(",") if v]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SynthGen benchmarks")
+    sub = parser.add_subparsers(dest="bench", required=True)
+
+    p = sub.add_parser("batch", help="records/sec vs. generation batch size")
+    p.add_argument("csv")
+    p.add_argument("--model", default=DEFAULT_MODEL)
+    p.add_argument("--sizes", type=_int_list, default=[1, 2, 4, 8, 16, 32, 64])
+    p.add_argument("--samples", type=int, default=64)
+
+    p = sub.add_parser("records", help="tokens and records per call vs. records per prompt (K)")
+    p.add_argument("csv")
+    p.add_argument("--model", default=DEFAULT_MODEL)
+    p.add_argument("--ks", type=_int_list, default=[1, 2, 4, 8])
+    p.add_argument("--samples", type=int, default=64)
+    p.add_argument("--batch-size", type=int, default=8)
+    p.add_argument("--max-new-tokens", type=int, default=None)
+
+    p = sub.add_parser("workers", help="records/sec and peak RSS vs. number of worker processes")
+    p.add_argument("csv")
+    p.add_argument("--model", default=DEFAULT_MODEL)
+    p.add_argument("--workers", type=_int_list, default=[1, 2, 4, 8])
+    p.add_argument("--samples", type=int, default=64)
+    p.add_argument("--batch-size", type=int, default=8)
+
+    p = sub.add_parser("backends", help="latency, memory and parse/validation success per model and backend")
+    p.add_argument("csv")
+    p.add_argument("--models", type=lambda v: v.split(","), default=[DEFAULT_MODEL],
+                   help="comma-separated checkpoints or large/base/small; the first fp32 row is the baseline")
+    p.add_argument("--backends", type=lambda v: v.split(","), default=list(BACKENDS))
+    p.add_argument("--samples", type=int, default=32)
+    p.add_argument("--batch-size", type=int, default=8)
+
+    p = sub.add_parser("constrained", help="accept/reject ratio with and without schema-constrained decoding")
+    p.add_argument("csv")
+    p.add_argument("--model", default=DEFAULT_MODEL)
+    p.add_argument("--samples", type=int, default=32)
+    p.add_argument("--batch-size", type=int, default=8)
+    p.add_argument("--records-per-prompt", type=int, default=1)
+
+    p = sub.add_parser("engines", help="records/sec and evaluator scores per generation engine")
+    p.add_argument("csv")
+    p.add_argument("--model", default=DEFAULT_MODEL)
+    p.add_argument("--engines", type=lambda v: v.split(","), default=list(ENGINES))
+    p.add_argument("--samples", type=int, default=64)
+    p.add_argument("--batch-size", type=int, default=8)
+    p.add_argument("--seed", type=int, default=0)
+
+    p = sub.add_parser("parse", help="record parser throughput on a wide synthetic schema")
+    p.add_argument("--columns", type=int, default=50)
+    p.add_argument("--texts", type=int, default=10000)
+
+    p = sub.add_parser("schema", help="column type inference on a large generated frame")
+    p.add_argument("--rows", type=int, default=1_000_000)
+    p.add_argument("--columns", type=int, default=50)
+    p.add_argument("--sample-rows", type=int, default=100_000)
+    p.add_argument("--skip-legacy", action="store_true")
+
+    p = sub.add_parser("suite", help="offline suite (synthetic CSV, tiny local model, recorded outputs) to JSON")
+    p.add_argument("--rows", type=int, default=100_000)
+    p.add_argument("--columns", type=int, default=20)
+    p.add_argument("--texts", type=int, default=5000, help="recorded outputs to parse and validate")
+    p.add_argument("--samples", type=int, default=16, help="records to generate end to end")
+    p.add_argument("--gen-columns", type=int, default=5, help="columns used for end-to-end generation")
+    p.add_argument("--repeat", type=int, default=3)
+    p.add_argument("--model", default=None, help="local checkpoint instead of the generated tiny model")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--output", default="bench_results.json")
+    p.add_argument("--baseline", default=None, help="earlier results file; exit 1 on regressions")
+    p.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown vs. baseline (0.2 = 20%%)")
+
+    args = parser.parse_args(argv)
+    logging.getLogger("synthgen").setLevel(logging.ERROR)
+    logging.getLogger("engines").setLevel(logging.ERROR)
+    if args.bench == "suite":
+        report = bench_suite(args.rows, args.columns, args.texts, args.samples, args.gen_columns, args.repeat,
+                             args.model, args.seed)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"📝 Results written to {args.output}")
+        if args.baseline:
+            with open(args.baseline) as f:
+                comparison = compare_results(report, json.load(f), args.tolerance)
+            print(comparison.to_string(index=False))
+            if comparison["regressed"].any():
+                sys.exit(1)
+        return
+    if args.bench == "batch":
+        result = bench_batch_sizes(pd.read_csv(args.csv), args.model, args.sizes, args.samples)
+    elif args.bench == "records":
+        result = bench_records_per_prompt(pd.read_csv(args.csv), args.model, args.ks, args.samples,
+                                          args.batch_size, args.max_new_tokens)
+    elif args.bench == "workers":
+        result = bench_worker_scaling(pd.read_csv(args.csv), args.model, args.workers, args.samples, args.batch_size)
+    elif args.bench == "backends":
+        result = bench_backends(pd.read_csv(args.csv), args.models, args.backends, args.samples, args.batch_size)
+    elif args.bench == "constrained":
+        result = bench_constrained(pd.read_csv(args.csv), args.model, args.samples, args.batch_size, args.records_per_prompt)
+    elif args.bench == "engines":
+        result = bench_engines(pd.read_csv(args.csv), args.engines, args.model, args.samples, args.batch_size, args.seed)
+    elif args.bench == "parse":
+        result = bench_parse(args.columns, args.texts)
+    elif args.bench == "schema":
+        result = bench_schema(args.rows, args.columns, args.sample_rows, not args.skip_legacy)
+    print(result.to_string(index=False))
+
+if __name__ == "__main__":
+    main()
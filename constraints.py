@@ -0,0 +1,113 @@
+%%writefile constraints.py
+import re
+import torch
+
+VALUE_PATTERNS = {
+    int: re.compile(r"^ ?-?\d*$"),
+    float: re.compile(r"^ ?\$?-?\d*\.?\d*$"),
+}
+NUMERIC_CHARS = set(" $-.0123456789")
+# Digits per numeric value: an int stays within int64 and a float within double precision,
+# so generated columns keep a numeric dtype
+MAX_DIGITS = {int: 18, float: 15}
+
+class SchemaConstraint:
+    """prefix_allowed_tokens_fn that makes the decoder emit "Field Name: value; ..." in column order.
+
+    Field labels and "; " separators are forced token by token. Numeric columns may only
+    use digit tokens (plus "$" and one "." for floats), at most MAX_DIGITS digits per value;
+    text values may use any token that does not contain ";" or ":". With records_per_prompt
+    > 1 the pattern repeats, each record joined to the previous one by the same separator.
+    """
+
+    def __init__(self, tokenizer, column_types, records_per_prompt=1, max_value_tokens=24):
+        self.column_types = list(column_types.values())
+        self.records_per_prompt = records_per_prompt
+        self.max_value_tokens = max_value_tokens
+        self.eos_id = tokenizer.eos_token_id
+        titles = [col.replace('_', ' ').title() for col in column_types]
+        encode = lambda text: tokenizer(text, add_special_tokens=False).input_ids
+        self.first_label = encode(f"{titles[0]}:")
+        self.labels = [encode(f"; {title}:") for title in titles]
+        pieces = tokenizer.convert_ids_to_tokens(list(range(len(tokenizer))))
+        self.pieces = [p.replace("▁", " ").replace("Ġ", " ") if p else "" for p in pieces]
+        # Separator tokens are only ever emitted to end a value, never inside one
+        special = set(tokenizer.all_special_ids) | {label[0] for label in self.labels}
+        self.text_ids = torch.tensor([i for i, p in enumerate(self.pieces)
+                                      if i not in special and p and ";" not in p and ":" not in p])
+        self.numeric_ids = [i for i, p in enumerate(self.pieces)
+                            if i not in special and p and set(p) <= NUMERIC_CHARS]
+        self._numeric_cache = {}
+        self._states = {}
+
+    def reset(self):
+        self._states = {}
+
+    def _initial(self):
+        # (record, column, forced label ids, position in label, value text, value token count)
+        return (0, 0, tuple(self.first_label), 0, None, 0)
+
+    def _advance(self, state, token):
+        if state == "done" or token == self.eos_id:
+            return "done"
+        record, col, label, pos, value, count = state
+        if value is None:
+            pos += 1
+            return (record, col, label, pos, "" if pos == len(label) else None, 0)
+        nxt = self._next(record, col)
+        if nxt is not None and value.strip() and token == nxt[2][0]:
+            return nxt[:3] + (1, "" if len(nxt[2]) == 1 else None, 0)
+        return (record, col, label, pos, value + self.pieces[token], count + 1)
+
+    def _next(self, record, col):
+        if col + 1 < len(self.column_types):
+            return (record, col + 1, tuple(self.labels[col + 1]))
+        if record + 1 < self.records_per_prompt:
+            return (record + 1, 0, tuple(self.labels[0]))
+        return None
+
+    def _state(self, ids):
+        # States are memoized per prefix length; generation only ever extends the previous
+        # step's prefixes, so older lengths are dropped to keep the cache O(batch).
+        if not ids:
+            return self._initial()
+        bucket = self._states.setdefault(len(ids), {})
+        state = bucket.get(ids)
+        if state is None:
+            state = self._advance(self._state(ids[:-1]), ids[-1])
+            bucket[ids] = state
+            self._states.pop(len(ids) - 2, None)
+        return state
+
+    def _numeric_allowed(self, typ, value):
+        key = (typ, value)
+        allowed = self._numeric_cache.get(key)
+        if allowed is None:
+            pattern, max_digits = VALUE_PATTERNS[typ], MAX_DIGITS[typ]
+            allowed = [i for i in self.numeric_ids if pattern.match(value + self.pieces[i])
+                       and sum(ch.isdigit() for ch in value + self.pieces[i]) <= max_digits]
+            self._numeric_cache[key] = allowed
+        return allowed
+
+    def __call__(self, batch_id, input_ids):
+        # input_ids[0] is the decoder start token
+        state = self._state(tuple(input_ids[1:].tolist()))
+        if state == "done":
+            return [self.eos_id]
+        record, col, label, pos, value, count = state
+        if value is None:
+            return [label[pos]]
+        nxt = self._next(record, col)
+        end = [nxt[2][0]] if nxt is not None else [self.eos_id]
+        if value.strip() and count >= self.max_value_tokens:
+            return end
+        typ = self.column_types[col]
+        if typ in VALUE_PATTERNS:
+            allowed = self._numeric_allowed(typ, value)
+            if any(ch.isdigit() for ch in value):
+                allowed = allowed + end
+            return allowed or end
+        allowed = self.text_ids
+        if value.strip():
+            allowed = torch.cat([allowed, torch.tensor(end)])
+        return allowed
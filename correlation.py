@@ -0,0 +1,144 @@
+%%writefile correlation.py
+import numpy as np
+import pandas as pd
+
+CHUNK_ROWS = 100_000
+CRAMERS_MAX_LEVELS = 50
+METHODS = ("pearson", "spearman", "cramers_v")
+
+class CorrelationStats:
+    """Pearson correlations from sums and cross-products accumulated chunk by chunk.
+
+    Like DataFrame.corr(), each pair uses the rows where both columns are present. Values
+    are shifted by the first chunk's column means to keep the sums well conditioned.
+    """
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        p = len(self.columns)
+        self.shift = None
+        self.n = np.zeros((p, p))
+        self.sx = np.zeros((p, p))   # sx[i, j]: sum of column i over rows where j is present too
+        self.sxx = np.zeros((p, p))
+        self.sxy = np.zeros((p, p))
+
+    def update(self, frame):
+        values = frame[self.columns].to_numpy(dtype="float64", na_value=np.nan)
+        present = ~np.isnan(values)
+        if self.shift is None:
+            counts = present.sum(axis=0)
+            self.shift = np.divide(np.where(present, values, 0.0).sum(axis=0), counts,
+                                   out=np.zeros(len(self.columns)), where=counts > 0)
+        x = np.where(present, values - self.shift, 0.0)
+        m = present.astype("float64")
+        self.n += m.T @ m
+        self.sx += x.T @ m
+        self.sxx += (x * x).T @ m
+        self.sxy += x.T @ x
+        return self
+
+    def matrix(self, columns=None):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cov = self.n * self.sxy - self.sx * self.sx.T
+            var = self.n * self.sxx - self.sx ** 2
+            r = np.clip(cov / np.sqrt(var * var.T), -1.0, 1.0)
+        frame = pd.DataFrame(r, index=self.columns, columns=self.columns)
+        return frame if columns is None else frame.loc[columns, columns]
+
+def cramers_v(table):
+    table = table[table.sum(axis=1) > 0][:, table.sum(axis=0) > 0]
+    n = table.sum()
+    if n == 0 or min(table.shape) < 2:
+        return np.nan
+    expected = np.outer(table.sum(axis=1), table.sum(axis=0)) / n
+    chi2 = ((table - expected) ** 2 / expected).sum()
+    return float(np.sqrt(chi2 / n / (min(table.shape) - 1)))
+
+class AssociationStats:
+    """Cramér's V between categorical columns from contingency tables accumulated chunk by chunk.
+
+    Columns with more than `max_levels` distinct values (ids, free text) are dropped.
+    """
+
+    def __init__(self, columns, max_levels=CRAMERS_MAX_LEVELS):
+        self.columns = list(columns)
+        self.max_levels = max_levels
+        self.levels = {col: {} for col in self.columns}  # value -> code, per column still tracked
+        self.tables = {}
+
+    def update(self, frame):
+        codes = {}
+        for col in list(self.levels):
+            levels = self.levels[col]
+            for value in frame[col].dropna().unique():
+                levels.setdefault(value, len(levels))
+            if len(levels) > self.max_levels:
+                del self.levels[col]
+                continue
+            codes[col] = frame[col].map(levels).to_numpy(dtype="float64", na_value=np.nan)
+        tracked = list(codes)
+        for i, a in enumerate(tracked):
+            for b in tracked[i + 1:]:
+                both = ~(np.isnan(codes[a]) | np.isnan(codes[b]))
+                shape = (len(self.levels[a]), len(self.levels[b]))
+                flat = codes[a][both].astype(int) * shape[1] + codes[b][both].astype(int)
+                counts = np.bincount(flat, minlength=shape[0] * shape[1]).reshape(shape)
+                table = self.tables.get((a, b))
+                if table is not None:
+                    counts[:table.shape[0], :table.shape[1]] += table
+                self.tables[(a, b)] = counts
+        return self
+
+    def matrix(self):
+        cols = [col for col in self.columns if col in self.levels]
+        index = {col: i for i, col in enumerate(cols)}
+        v = np.full((len(cols), len(cols)), np.nan)
+        for col in cols:
+            if len(self.levels[col]) > 1:
+                v[index[col], index[col]] = 1.0
+        for (a, b), table in self.tables.items():
+            if a in index and b in index:
+                v[index[a], index[b]] = v[index[b], index[a]] = cramers_v(table)
+        return pd.DataFrame(v, index=cols, columns=cols)
+
+def _chunks(df, chunksize):
+    for start in range(0, len(df), chunksize):
+        yield df.iloc[start:start + chunksize]
+
+def correlation_matrices(df, column_types, methods=("pearson",), chunksize=CHUNK_ROWS):
+    """{method: matrix} for "pearson", "spearman" (Pearson on ranks) and "cramers_v", built chunk by chunk."""
+    numeric = [col for col, typ in column_types.items() if typ in (int, float)]
+    categorical = [col for col, typ in column_types.items() if typ is str]
+    engines = {}
+    if "pearson" in methods:
+        engines["pearson"] = (CorrelationStats(numeric), df[numeric])
+    if "spearman" in methods:
+        # Each column is ranked once over its non-null values
+        engines["spearman"] = (CorrelationStats(numeric), df[numeric].rank())
+    if "cramers_v" in methods:
+        engines["cramers_v"] = (AssociationStats(categorical), df[categorical])
+    matrices = {}
+    for method, (stats, data) in engines.items():
+        for chunk in _chunks(data, chunksize):
+            stats.update(chunk)
+        matrices[method] = stats.matrix()
+    return matrices
+
+def diverged_pairs(original, synthetic, k=10):
+    """The k column pairs whose coefficient differs most between two matrices, largest first."""
+    cols = [col for col in original.columns if col in synthetic.columns]
+    a = original.loc[cols, cols].to_numpy()
+    b = synthetic.loc[cols, cols].to_numpy()
+    i, j = np.triu_indices(len(cols), k=1)
+    diff = np.abs(a[i, j] - b[i, j])
+    valid = np.flatnonzero(~np.isnan(diff))
+    if 0 < k < len(valid):
+        valid = valid[np.argpartition(-diff[valid], k - 1)[:k]]
+    top = valid[np.argsort(-diff[valid], kind="stable")][:k]
+    return pd.DataFrame({
+        "column_a": [cols[x] for x in i[top]],
+        "column_b": [cols[x] for x in j[top]],
+        "original": a[i[top], j[top]],
+        "synthetic": b[i[top], j[top]],
+        "difference": diff[top],
+    })
@@ -0,0 +1,333 @@
+%%writefile engines.py
+import logging
+import time
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr, ndtri
+import synthgen
+from correlation import CorrelationStats
+from ingest import DatasetScan
+from memorization import MemorizationIndex
+from reference_profile import ReferenceProfile
+from telemetry import RunTelemetry, totals
+
+logger = logging.getLogger(__name__)
+
+CHUNK_ROWS = 100_000
+FIT_MAX_ROWS = 100_000
+CATEGORY_MAX_LEVELS = 50  # text columns with more distinct values are free text
+QUANTILES = 1025
+Z_MAX = 5.0  # the quantile grid covers normal scores in [-Z_MAX, Z_MAX]
+TEXT_MAX_TOKENS = 16
+TEXT_REDRAWS = 3  # draws of a free-text value that equals a source value before it is left blank
+TOKEN_PATTERN = r"[\w#]+|[^\w#]"
+MAX_EMPTY_CHUNKS = 10  # memorization="reject": give up after this many chunks in a row lose every row
+
+def source_frame(df):
+    """(frame, column_types) to fit on: a profile's or scan's sample, else the frame with load_csv_data's types."""
+    if isinstance(df, (DatasetScan, ReferenceProfile)):
+        return df.sample, df.column_types
+    _, column_types = synthgen.load_csv_data(df, rng=np.random.default_rng(0))
+    return df, column_types
+
+def _decimals(values, max_decimals=6):
+    return next((d for d in range(max_decimals) if np.allclose(values, np.round(values, d), rtol=0, atol=1e-9)),
+                max_decimals)
+
+def _table(values):
+    counts = values.value_counts()
+    return counts.index.to_numpy(dtype=object), np.cumsum(counts.to_numpy()) / counts.sum()
+
+def _draw(table, n, rng):
+    values, cumulative = table
+    return values[np.minimum(np.searchsorted(cumulative, rng.random(n), side="right"), len(values) - 1)]
+
+class TokenModel:
+    """Free text as a sequence of word/punctuation tokens, each drawn from the tokens seen at
+    that position in source values with the same token count; digits become "#" and are
+    redrawn at random. Draws equal to a source value are redrawn, then left blank.
+    """
+
+    def __init__(self, values):
+        values = values.dropna().astype(str)
+        self.source = pd.Index(values.unique())
+        tokens = values.str.replace(r"\d", "#", regex=True).str.findall(TOKEN_PATTERN)
+        tokens = tokens[tokens.str.len() > 0].str[:TEXT_MAX_TOKENS]
+        lengths = tokens.str.len()
+        self.lengths = _table(lengths)
+        self.positions = {length: [_table(group.str[i]) for i in range(length)]
+                          for length, group in tokens.groupby(lengths)}
+
+    def _draw(self, n, rng):
+        out = np.empty(n, dtype=object)
+        lengths = _draw(self.lengths, n, rng)
+        for length in np.unique(lengths):
+            rows = np.flatnonzero(lengths == length)
+            parts = [_draw(table, len(rows), rng) for table in self.positions[length]]
+            out[rows] = ["".join(tokens) for tokens in zip(*parts)]
+        # Every "#" of the joined text gets a random digit
+        data = np.frombuffer("\0".join(out).encode(), dtype=np.uint8).copy()
+        digits = np.flatnonzero(data == ord("#"))
+        data[digits] = ord("0") + rng.integers(0, 10, len(digits), dtype=np.uint8)
+        return np.array(data.tobytes().decode().split("\0"), dtype=object)
+
+    def sample(self, n, rng):
+        out = self._draw(n, rng) if n else np.empty(0, dtype=object)
+        copied = np.flatnonzero(self.source.get_indexer(out) >= 0)
+        for _ in range(TEXT_REDRAWS):
+            if not len(copied):
+                break
+            out[copied] = self._draw(len(copied), rng)
+            copied = copied[self.source.get_indexer(out[copied]) >= 0]
+        out[copied] = np.nan
+        return out
+
+class LLMEngine:
+    """The few-shot language-model loop; gen_kwargs go to iter_synthetic_data unchanged."""
+
+    def __init__(self, df, **gen_kwargs):
+        self.df = df
+        self.gen_kwargs = gen_kwargs
+
+    def iter_frames(self, num_samples, seed=None, stats=None, telemetry=None):
+        return synthgen.iter_synthetic_data(self.df, num_samples, seed=seed, stats=stats, telemetry=telemetry,
+                                            as_frames=True, **self.gen_kwargs)
+
+class StatisticalEngine:
+    """Gaussian copula over per-column empirical marginals, sampled with NumPy in chunks.
+
+    Fitting turns each column into normal scores: numbers through their ranks, text through
+    a uniform draw inside the value's cumulative-frequency interval. The pairwise-complete
+    correlation of the scores is the copula. Sampling draws correlated normals and maps them
+    straight back to values: numbers through a quantile table on an even grid of normal
+    scores (one multiply to find the cell, rounded to the decimals seen), text through the
+    normal scores of its cumulative frequencies. Free-text columns (text with more than
+    CATEGORY_MAX_LEVELS distinct values) stay out of the copula: a TokenModel writes them,
+    never repeating a source value, or with free_text=False they are left empty for
+    HybridEngine's language model.
+
+    `memorization="reject"` drops sampled rows that copy or nearly copy a source row (see
+    MemorizationIndex) and samples more; "flag" keeps them and lists them in `stats["memorized"]`.
+    """
+
+    def __init__(self, df, column_types=None, max_fit_rows=FIT_MAX_ROWS, chunk_rows=CHUNK_ROWS, seed=0,
+                 memorization=None, free_text=True, index=None):
+        start = time.perf_counter()
+        if memorization not in (None, "flag", "reject"):
+            raise ValueError(f"Unknown memorization mode: {memorization}")
+        source = df
+        if column_types is None:
+            df, column_types = source_frame(df)
+        self.memorization = memorization
+        self.index = (index or synthgen.memorization_index(source, column_types)) if memorization else None
+        if len(df) > max_fit_rows:
+            df = df.sample(max_fit_rows, random_state=seed)
+        rng = np.random.default_rng(seed)
+        self.column_types = dict(column_types)
+        self.chunk_rows = chunk_rows
+        grid = ndtr(np.linspace(-Z_MAX, Z_MAX, QUANTILES))
+        self.marginals = {}
+        self.text_columns = []
+        scores = {}
+        for col in [col for col, typ in self.column_types.items() if typ in (int, float)]:
+            values = df[col]
+            if not pd.api.types.is_numeric_dtype(values):
+                values = pd.to_numeric(values.astype(str).str.replace(r"[$,]", "", regex=True), errors="coerce")
+            values = values.astype("float64")
+            present = values.dropna().to_numpy()
+            if not len(present):
+                continue
+            decimals = 0 if self.column_types[col] is int else _decimals(present)
+            self.marginals[col] = ("number", np.quantile(present, grid), decimals)
+            scores[col] = ndtri(((values.rank() - 0.5) / len(present)).to_numpy())
+        axis = None
+        if scores:
+            # Rows projected on the leading principal component of the numeric scores
+            filled = np.nan_to_num(np.column_stack(list(scores.values())))
+            _, vectors = np.linalg.eigh(np.nan_to_num(np.atleast_2d(np.corrcoef(filled, rowvar=False))))
+            axis = pd.Series(filled @ vectors[:, -1], index=df.index)
+        for col in [col for col, typ in self.column_types.items() if typ not in (int, float)]:
+            values = df[col]
+            counts = values.value_counts()
+            if not len(counts):
+                continue
+            if len(counts) > CATEGORY_MAX_LEVELS:
+                self.text_columns.append(col)
+                if free_text:
+                    self.marginals[col] = ("free_text", TokenModel(values), None)
+                continue
+            if axis is not None:
+                # Levels in order along that component, so a single copula correlation can tie them to the numbers
+                order = axis.groupby(values).mean().reindex(counts.index).to_numpy()
+                counts = counts.iloc[np.argsort(order, kind="stable")]
+            cumulative = np.cumsum(counts.to_numpy()) / counts.sum()
+            self.marginals[col] = ("text", counts.index.to_numpy(dtype=object), ndtri(cumulative[:-1]))
+            codes = pd.Categorical(values, categories=counts.index).codes
+            present = codes >= 0
+            upper = cumulative[codes[present]]
+            lower = upper - counts.to_numpy()[codes[present]] / counts.sum()
+            u = np.full(len(values), np.nan)
+            u[present] = lower + rng.random(present.sum()) * (upper - lower)
+            scores[col] = ndtri(np.clip(u, 1e-12, 1 - 1e-12))
+        self.columns = list(scores)
+        corr = CorrelationStats(self.columns).update(pd.DataFrame(scores)).matrix().to_numpy()
+        corr = np.nan_to_num(corr, nan=0.0)
+        np.fill_diagonal(corr, 1.0)
+        # Pairwise-complete estimates need not be positive definite; clip the spectrum and rescale
+        eigenvalues, eigenvectors = np.linalg.eigh(corr)
+        corr = (eigenvectors * np.maximum(eigenvalues, 1e-6)) @ eigenvectors.T
+        scale = np.sqrt(np.diag(corr))
+        self.correlation = corr / np.outer(scale, scale)
+        self.cholesky = np.linalg.cholesky(self.correlation).astype(np.float32)
+        logger.info(f"🎲 Gaussian copula over {len(self.columns)} columns fitted on {len(df)} rows "
+                    f"in {time.perf_counter() - start:.2f}s")
+        if free_text and self.text_columns:
+            logger.warning(f"🧾 Free-text columns {self.text_columns} are assembled from source tokens, "
+                           f"independently of the other columns; the hybrid engine writes them with the language model")
+
+    def sample(self, num_rows, rng=None):
+        rng = rng or np.random.default_rng()
+        z = self.cholesky @ rng.standard_normal((len(self.columns), num_rows), dtype=np.float32)
+        columns = {}
+        for i, col in enumerate(self.columns):
+            kind, table, extra = self.marginals[col]
+            if kind == "number":
+                position = np.clip((z[i] + Z_MAX) * ((QUANTILES - 1) / (2 * Z_MAX)), 0, QUANTILES - 1)
+                cell = np.minimum(position.astype(np.intp), QUANTILES - 2)
+                values = (table[cell] + (position - cell) * (table[cell + 1] - table[cell])).round(extra)
+                columns[col] = values.astype("int64") if self.column_types[col] is int else values
+            else:
+                columns[col] = table[np.searchsorted(extra, z[i], side="right")]
+        for col in self.text_columns:
+            if col in self.marginals:
+                columns[col] = self.marginals[col][1].sample(num_rows, rng)
+        return pd.DataFrame({col: columns.get(col, np.full(num_rows, np.nan)) for col in self.column_types})
+
+    def iter_frames(self, num_samples, seed=None, stats=None, telemetry=None):
+        telemetry = telemetry or RunTelemetry()
+        stats = {} if stats is None else stats
+        rng = np.random.default_rng(seed)
+        produced = empty = 0
+        try:
+            while produced < num_samples:
+                with telemetry.stage("sample"):
+                    frame = self.sample(min(self.chunk_rows, num_samples - produced), rng)
+                if self.index is not None:
+                    frame = self._check_memorization(frame, produced, stats, telemetry)
+                    empty = 0 if len(frame) else empty + 1
+                    if empty >= MAX_EMPTY_CHUNKS:
+                        logger.warning(f"🔁 Every sampled row copied a source row {empty} chunks in a row; "
+                                       f"stopping at {produced} of {num_samples} records")
+                        break
+                    if not len(frame):
+                        continue
+                produced += len(frame)
+                stats["records"] = produced
+                telemetry.count("records", len(frame))
+                with telemetry.stage("consumer"):
+                    yield frame
+        finally:
+            telemetry.finish()
+            totals.merge(telemetry)
+            stats["records"] = produced
+            stats["telemetry"] = report = telemetry.report()
+            logger.info(f"⏱️ {produced} records in {report['elapsed_seconds']}s ({report['records_per_sec']} rec/s)")
+
+    def _check_memorization(self, frame, produced, stats, telemetry):
+        with telemetry.stage("memorization"):
+            kinds, similarity = self.index.match(frame)
+        copied = np.flatnonzero(kinds != "")
+        for kind in kinds[copied]:
+            telemetry.count(f"memorized_{kind}")
+        if not len(copied):
+            return frame
+        logger.warning(f"🔁 {len(copied)} of {len(kinds)} records copy source rows "
+                       f"({int((kinds == 'exact').sum())} exact)")
+        if self.memorization == "reject":
+            return frame[kinds == ""].reset_index(drop=True)
+        stats.setdefault("memorized", []).extend(
+            {"record": produced + int(i), "kind": kinds[i], "similarity": round(float(similarity[i]), 3)}
+            for i in copied)
+        return frame
+
+class HybridEngine:
+    """StatisticalEngine for numbers and categories; the language model writes only the free-text columns.
+
+    The text columns are generated from prompts and examples of those columns alone, so they
+    are independent of the rest of the row. With `memorization`, the language model checks
+    its text against the source's text columns and every combined row is checked against the
+    full source rows; under "reject" a copied row gets its statistical columns redrawn (up to
+    TEXT_REDRAWS times) and is dropped if it still copies a source row.
+    """
+
+    def __init__(self, df, memorization=None, **gen_kwargs):
+        frame, column_types = source_frame(df)
+        index = synthgen.memorization_index(df, column_types) if memorization else None
+        self.statistical = StatisticalEngine(frame, column_types, free_text=False, memorization=memorization,
+                                             index=index)
+        self.text_columns = self.statistical.text_columns
+        self.llm = None
+        if self.text_columns:
+            text = frame[self.text_columns].copy()
+            text_index = MemorizationIndex({col: column_types[col] for col in self.text_columns}, text) \
+                if memorization else None
+            self.llm = LLMEngine(text, memorization=memorization, source_index=text_index, **gen_kwargs)
+
+    def _redraw_copies(self, frame, rng, telemetry):
+        # Fresh statistical columns for rows that copy a source row; the generated text is kept
+        columns = [col for col in frame.columns if col not in self.text_columns]
+        for _ in range(TEXT_REDRAWS):
+            with telemetry.stage("memorization"):
+                kinds, _ = self.statistical.index.match(frame)
+            copied = np.flatnonzero(kinds != "")
+            if not len(copied):
+                break
+            telemetry.count("memorized_redrawn", len(copied))
+            redrawn = self.statistical.sample(len(copied), rng)
+            for col in columns:
+                frame.loc[copied, col] = redrawn[col].to_numpy()
+        return frame
+
+    def iter_frames(self, num_samples, seed=None, stats=None, telemetry=None):
+        if self.llm is None:
+            yield from self.statistical.iter_frames(num_samples, seed, stats, telemetry)
+            return
+        telemetry = telemetry or RunTelemetry()
+        stats = {} if stats is None else stats
+        rng = np.random.default_rng(seed)
+        with telemetry.stage("sample"):
+            rows = self.statistical.sample(num_samples, rng)
+        used = produced = 0
+        flagged = len(stats.get("memorized", []))
+        for text in self.llm.iter_frames(num_samples, seed, stats, telemetry):
+            frame = rows.iloc[used:used + len(text)].reset_index(drop=True)
+            used += len(text)
+            for col in self.text_columns:
+                frame[col] = text[col].to_numpy()
+            if self.statistical.index is not None:
+                if self.statistical.memorization == "reject":
+                    frame = self._redraw_copies(frame, rng, telemetry)
+                frame = self.statistical._check_memorization(frame, produced, stats, telemetry)
+                if "memorized" in stats:
+                    # A row flagged for its text and again as a whole is listed once, as the whole-row match
+                    ours = {entry["record"]: entry for entry in stats["memorized"][flagged:]}
+                    stats["memorized"][flagged:] = list(ours.values())
+            produced += len(frame)
+            if len(frame):
+                yield frame
+        stats["records"] = produced
+
+ENGINES = {"llm": LLMEngine, "statistical": StatisticalEngine, "hybrid": HybridEngine}
+
+def make_engine(name, df, **gen_kwargs):
+    """Engine `name` for the source `df`; gen_kwargs (iter_synthetic_data settings) reach the language model,
+    and of them only `memorization` applies to the statistical engine."""
+    if name not in ENGINES:
+        raise ValueError(f"Unknown engine: {name}")
+    if name == "statistical":
+        return StatisticalEngine(df, memorization=gen_kwargs.get("memorization"))
+    return ENGINES[name](df, **gen_kwargs)
+
+def generate_with_engine(name, df, num_samples, seed=None, stats=None, **gen_kwargs):
+    frames = list(make_engine(name, df, **gen_kwargs).iter_frames(num_samples, seed=seed, stats=stats))
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
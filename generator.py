@@ -1,122 +1,512 @@
-%%writefile synthgen.py
-import pandas as pd
-import re
-import random
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
-import torch
-from typing import Optional
-from pydantic import BaseModel, create_model, ValidationError
-import logging
-
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
-
-def load_csv_data(df):
-    df.columns = [c.strip().replace(" ", "_").lower() for c in df.columns]
-    column_types = {}
-    for col in df.columns:
-        col_data = df[col].dropna()
-        if col_data.empty:
-            column_types[col] = str
-        else:
-            try:
-                pd.to_numeric(col_data)
-                if all(col_data.apply(lambda x: float(x).is_integer())):
-                    column_types[col] = int
-                else:
-                    column_types[col] = float
-            except:
-                column_types[col] = str
-    examples = []
-    for _, row in df.dropna().sample(min(5, len(df))).iterrows():
-        parts = []
-        for col in df.columns:
-            val = row[col]
-            if pd.isna(val): continue
-            name = col.replace("_", " ").title()
-            if column_types[col] == float:
-                parts.append(f"{name}: ${float(val):.2f}")
-            else:
-                parts.append(f"{name}: {val}")
-        examples.append("; ".join(parts))
-    return examples, column_types
-
-def create_dynamic_model(column_specs):
-    fields = {col: (Optional[typ], None) for col, typ in column_specs.items()}
-    return create_model("DynamicRecord", **fields)
-
-def parse_generated_text(text, column_types):
-    text = re.sub(r"\s+", " ", text.strip())
-    matches = re.findall(r'([\w\s]+):\s*([^;]+)', text)
-    if not matches:
-        return None
-    record = {}
-    expected = list(column_types.keys())
-    expected_titles = [c.replace('_', ' ').title() for c in expected]
-    for key, val in matches:
-        key_clean = key.strip().title()
-        matched = next((c for c in expected_titles if key_clean.lower() in c.lower()), None)
-        if matched:
-            actual_key = matched.replace(" ", "_").lower()
-            typ = column_types[actual_key]
-            try:
-                val = val.replace("$", "").replace(",", "").strip()
-                if not val or val.lower() == 'nan':
-                    return None
-                if typ == int:
-                    record[actual_key] = int(float(val))
-                elif typ == float:
-                    record[actual_key] = float(val)
-                else:
-                    record[actual_key] = str(val.strip())
-            except:
-                return None
-    return record if record else None
-
-def generate_synthetic_data(df, num_samples):
-    examples, column_types = load_csv_data(df)
-    DynamicModel = create_dynamic_model(column_types)
-    model_name = "google/flan-t5-large"
-    tokenizer = AutoTokenizer.from_pretrained(model_name)
-    model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
-    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-    model.to(device)
-    synthetic_data = []
-    max_attempts = num_samples * 10
-    attempts = 0
-    creativity_phrases = [
-        "Create a unique and diverse record:",
-        "Invent a different, realistic patient entry:",
-        "Generate a varied and creative record:",
-        "Simulate a new and distinctive patient entry:"
-    ]
-    while len(synthetic_data) < num_samples and attempts < max_attempts:
-        attempts += 1
-        sampled_examples = random.sample(examples, min(3, len(examples)))
-        example_text = "\n".join(sampled_examples)
-        creativity_prompt = random.choice(creativity_phrases)
-        field_list = ", ".join([col.replace('_', ' ').title() for col in column_types.keys()])
-        prompt = (
-            f"Generate realistic and diverse synthetic medical billing records with the following fields:\n"
-            f"{field_list}\n\n"
-            "Each record should follow this format:\n"
-            "Field Name: Value; Field Name: Value; ...\n\n"
-            "Examples:\n" + example_text +
-            f"\n\n{creativity_prompt}\n"
-        )
-        input_ids = tokenizer(prompt, return_tensors="pt", truncation=True).input_ids.to(device)
-        outputs = model.generate(input_ids, max_new_tokens=128, temperature=1.0, top_p=0.95, do_sample=True)
-        output_text = tokenizer.decode(outputs[0], skip_special_tokens=True)
-        parsed = parse_generated_text(output_text, column_types)
-        if not parsed:
-            logger.warning(f"❌ Record {len(synthetic_data)+1}: Failed to parse")
-            continue
-        try:
-            validated = DynamicModel(**parsed)
-            if any(val is None or str(val).strip() == "" for val in validated.model_dump().values()):
-                continue
-            synthetic_data.append(validated.model_dump())
-            logger.info(f"✅ Record {len(synthetic_data)} added")
-        except ValidationError:
-            continue
-    return pd.DataFrame(synthetic_data)
\ No newline at end of file
+%%writefile synthgen.py
+import os
+import numpy as np
+import pandas as pd
+import re
+import random
+import torch
+from typing import Optional
+from pydantic import BaseModel, create_model, ValidationError
+import logging
+import threading
+import time
+import weakref
+from functools import lru_cache
+from collections import OrderedDict
+from transformers.modeling_outputs import BaseModelOutput
+from constraints import SchemaConstraint
+from ingest import DatasetScan
+from memorization import MemorizationIndex
+from model_registry import DEFAULT_BACKEND, DEFAULT_MODEL, get_model
+from reference_profile import ReferenceProfile
+from schema import infer_schema, normalize_columns
+from telemetry import RunTelemetry, totals
+from validation import ColumnarValidator, frame_records
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def format_example(row, column_types):
+    parts = []
+    for col, typ in column_types.items():
+        val = row[col]
+        if pd.isna(val): continue
+        name = col.replace("_", " ").title()
+        if typ == float:
+            parts.append(f"{name}: ${float(val):.2f}")
+        else:
+            parts.append(f"{name}: {val}")
+    return "; ".join(parts)
+
+def load_csv_data(df, schema_sample_rows=None, rng=None):
+    if isinstance(df, (DatasetScan, ReferenceProfile)):
+        column_types = df.column_types
+        return [format_example(row, column_types) for _, row in df.example_rows.iterrows()], column_types
+    df.columns = normalize_columns(df.columns)
+    column_types = infer_schema(df, sample_rows=schema_sample_rows).column_types
+    # Sample positions of complete rows instead of copying the whole frame with dropna()
+    complete = np.flatnonzero(df.notna().all(axis=1).to_numpy())
+    picked = (rng or np.random).choice(complete, min(5, len(complete)), replace=False)
+    examples = [format_example(row, column_types) for _, row in df.iloc[picked].iterrows()]
+    return examples, column_types
+
+_scan_indexes = weakref.WeakKeyDictionary()
+
+def memorization_index(df, column_types):
+    """MemorizationIndex over the source rows: cached on a profile, built once per scan, else from the frame."""
+    if isinstance(df, ReferenceProfile):
+        return df.memorization
+    if isinstance(df, DatasetScan):
+        if df not in _scan_indexes:
+            _scan_indexes[df] = MemorizationIndex(column_types, pd.concat([df.example_rows, df.sample]))
+        return _scan_indexes[df]
+    return MemorizationIndex(column_types, df)
+
+def create_dynamic_model(column_specs):
+    fields = {col: (Optional[typ], None) for col, typ in column_specs.items()}
+    return create_model("DynamicRecord", **fields)
+
+class RecordParser:
+    """Parses "Field Name: Value; ..." outputs for one schema.
+
+    Regexes and the normalized-label -> column table are built once. A label that is not an
+    exact match falls back to the first column whose label contains it (memoized).
+    """
+
+    _pairs = re.compile(r'([\w\s]+):\s*([^;]+)')
+    _strip_chars = str.maketrans("", "", "$,")
+
+    def __init__(self, column_types):
+        self.column_types = dict(column_types)
+        self._labels = [(self._normalize(col), col) for col in self.column_types]
+        self._lookup = {label: col for label, col in reversed(self._labels)}
+        self._fuzzy = {}
+        self._resolved = {}
+        self._converters = {col: self._converter(typ) for col, typ in self.column_types.items()}
+
+    @staticmethod
+    def _normalize(label):
+        return " ".join(label.replace("_", " ").split()).lower()
+
+    @staticmethod
+    def _converter(typ):
+        if typ == int:
+            return lambda val: int(float(val))
+        if typ == float:
+            return float
+        return str
+
+    def column_for(self, key):
+        try:
+            return self._resolved[key]
+        except KeyError:
+            pass
+        label = self._normalize(key)
+        col = self._lookup.get(label)
+        if col is None:
+            if label not in self._fuzzy:
+                self._fuzzy[label] = next((c for title, c in self._labels if label in title), None)
+            col = self._fuzzy[label]
+        if len(self._resolved) < 4096:
+            self._resolved[key] = col
+        return col
+
+    def parse(self, text):
+        matches = self._pairs.findall(" ".join(text.split()))
+        if not matches:
+            return None
+        record = {}
+        for key, val in matches:
+            col = self.column_for(key)
+            if col is None:
+                continue
+            if "$" in val or "," in val:
+                val = val.translate(self._strip_chars)
+            val = val.strip()
+            if not val or val.lower() == 'nan':
+                return None
+            try:
+                record[col] = self._converters[col](val)
+            except (ValueError, OverflowError):
+                return None
+        return record if record else None
+
+    def parse_batch(self, texts):
+        return [self.parse(text) for text in texts]
+
+@lru_cache(maxsize=32)
+def _cached_parser(schema):
+    return RecordParser(dict(schema))
+
+def get_parser(column_types):
+    return _cached_parser(tuple(column_types.items()))
+
+def parse_generated_text(text, column_types):
+    return get_parser(column_types).parse(text)
+
+CREATIVITY_PHRASES = [
+    "Create a unique and diverse record:",
+    "Invent a different, realistic patient entry:",
+    "Generate a varied and creative record:",
+    "Simulate a new and distinctive patient entry:"
+]
+
+def build_prompt(examples, column_types, records_per_prompt=1, rng=random):
+    sampled_examples = rng.sample(examples, min(3, len(examples)))
+    example_text = "\n".join(sampled_examples)
+    creativity_prompt = rng.choice(CREATIVITY_PHRASES)
+    if records_per_prompt > 1:
+        creativity_prompt += f" Write {records_per_prompt} different records, one per line."
+    field_list = ", ".join([col.replace('_', ' ').title() for col in column_types.keys()])
+    return (
+        f"Generate realistic and diverse synthetic medical billing records with the following fields:\n"
+        f"{field_list}\n\n"
+        "Each record should follow this format:\n"
+        "Field Name: Value; Field Name: Value; ...\n\n"
+        "Examples:\n" + example_text +
+        f"\n\n{creativity_prompt}\n"
+    )
+
+def split_records(text, column_types):
+    # T5's tokenizer folds newlines into spaces, so besides line breaks a new record
+    # also starts wherever the first field's label appears again.
+    first = next(iter(column_types)).replace('_', ' ').title()
+    pattern = re.compile(rf"\n+|(?=\b{re.escape(first)}\s*:)", re.IGNORECASE)
+    return [seg.strip(" ;") for seg in pattern.split(text) if seg and seg.strip(" ;")]
+
+def _available_memory(device):
+    if device.type == "cuda":
+        free, _ = torch.cuda.mem_get_info(device)
+        return free
+    try:
+        import psutil
+        return psutil.virtual_memory().available
+    except ImportError:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+
+def auto_batch_size(model, prompt_tokens=512, max_new_tokens=128, max_batch_size=64, memory_fraction=0.5):
+    # Rough per-sequence footprint: encoder activations plus self/cross-attention KV caches
+    # across all layers, doubled for temporaries.
+    cfg = model.config
+    layers = getattr(cfg, "num_layers", 12) + getattr(cfg, "num_decoder_layers", getattr(cfg, "num_layers", 12))
+    d_model = getattr(cfg, "d_model", 1024)
+    elem = next(model.parameters()).element_size()
+    per_seq = 2 * 2 * layers * (prompt_tokens + max_new_tokens) * d_model * elem
+    budget = _available_memory(model.device) * memory_fraction
+    size = int(max(1, min(max_batch_size, budget // per_seq)))
+    return 1 << (size.bit_length() - 1)
+
+class EncoderCache:
+    """LRU of per-prompt encoder outputs, so each distinct prompt is encoded once.
+
+    Bounded by the total size of the cached tensors (numel * element_size), not by entry
+    count: one flan-t5-large prompt state is already a few MB.
+    """
+
+    def __init__(self, max_bytes=256 * 1024 ** 2):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        nbytes = value.numel() * value.element_size()
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old.numel() * old.element_size()
+            self._entries[key] = value
+            self.bytes += nbytes
+            while self.bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.bytes -= evicted.numel() * evicted.element_size()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+            self.hits = self.misses = 0
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries), "bytes": self.bytes,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0}
+
+encoder_cache = EncoderCache(int(float(os.environ.get("SYNTHGEN_ENCODER_CACHE_MB", "256")) * 1024 ** 2))
+
+def encode_prompts(tokenizer, model, prompts, cache=encoder_cache):
+    model_key = getattr(model, "synthgen_key", (model.config.name_or_path, str(model.dtype), str(model.device)))
+    states = [cache.get((model_key, prompt)) for prompt in prompts]
+    missing = list(dict.fromkeys(prompts[i] for i, state in enumerate(states) if state is None))
+    if missing:
+        inputs = tokenizer(missing, return_tensors="pt", padding=True, truncation=True).to(model.device)
+        with torch.inference_mode():
+            hidden = model.get_encoder()(**inputs).last_hidden_state
+        lengths = inputs["attention_mask"].sum(dim=1).tolist()
+        encoded = {prompt: hidden[row, :lengths[row]].clone() for row, prompt in enumerate(missing)}
+        for prompt, state in encoded.items():
+            cache.put((model_key, prompt), state)
+        states = [encoded[prompt] if state is None else state for prompt, state in zip(prompts, states)]
+    max_len = max(state.shape[0] for state in states)
+    hidden = states[0].new_zeros((len(states), max_len, states[0].shape[-1]))
+    attention_mask = torch.zeros((len(states), max_len), dtype=torch.long, device=model.device)
+    for row, state in enumerate(states):
+        hidden[row, :state.shape[0]] = state
+        attention_mask[row, :state.shape[0]] = 1
+    return BaseModelOutput(last_hidden_state=hidden), attention_mask
+
+def generate_texts(tokenizer, model, prompts, max_new_tokens=128, stats=None, use_encoder_cache=True, constraint=None,
+                   seed=None, telemetry=None):
+    telemetry = telemetry or RunTelemetry()
+    with telemetry.stage("encode"):
+        if use_encoder_cache and model.config.is_encoder_decoder:
+            encoder_outputs, attention_mask = encode_prompts(tokenizer, model, prompts)
+            inputs = {"encoder_outputs": encoder_outputs, "attention_mask": attention_mask}
+        else:
+            inputs = tokenizer(prompts, return_tensors="pt", padding=True, truncation=True).to(model.device)
+    if constraint is not None:
+        constraint.reset()
+        inputs["prefix_allowed_tokens_fn"] = constraint
+    # A seeded call samples from its own RNG state and leaves the global torch generator untouched
+    devices = [model.device] if seed is not None and model.device.type == "cuda" else []
+    with telemetry.stage("generate"), torch.random.fork_rng(devices=devices, enabled=seed is not None), \
+            torch.inference_mode():
+        if seed is not None:
+            torch.manual_seed(seed)
+        outputs = model.generate(**inputs, max_new_tokens=max_new_tokens, temperature=1.0, top_p=0.95, do_sample=True)
+    generated = (outputs[:, 1:] != tokenizer.pad_token_id).sum(dim=1)
+    prompt_lengths = inputs["attention_mask"].sum(dim=1)
+    tokens_in, tokens_out = int(prompt_lengths.sum()), int(generated.sum())
+    telemetry.count("tokens_in", tokens_in)
+    telemetry.count("tokens_out", tokens_out)
+    if stats is not None:
+        stats["calls"] = stats.get("calls", 0) + 1
+        stats["prompts"] = stats.get("prompts", 0) + len(prompts)
+        stats["prompt_tokens"] = stats.get("prompt_tokens", 0) + tokens_in
+        stats["output_tokens"] = stats.get("output_tokens", 0) + tokens_out
+        stats["hit_token_limit"] = stats.get("hit_token_limit", 0) + int((generated >= max_new_tokens).sum())
+        stats["row_tokens"] = list(zip(prompt_lengths.tolist(), generated.tolist()))  # this call, per prompt
+    with telemetry.stage("decode"):
+        return tokenizer.batch_decode(outputs, skip_special_tokens=True)
+
+def check_record(parsed, DynamicModel):
+    """Return (record, None) or (None, reason) with reason "invalid" or "empty_field"."""
+    try:
+        record = DynamicModel(**parsed).model_dump()
+    except ValidationError:
+        return None, "invalid"
+    if any(val is None or str(val).strip() == "" for val in record.values()):
+        return None, "empty_field"
+    return record, None
+
+def validate_record(parsed, DynamicModel):
+    return check_record(parsed, DynamicModel)[0]
+
+def iter_synthetic_data(df, num_samples, model_name=DEFAULT_MODEL, batch_size=1, records_per_prompt=1,
+                        max_new_tokens=None, stats=None, use_encoder_cache=True, chunk_size=None,
+                        backend=DEFAULT_BACKEND, constrained=False, seed=None, telemetry=None,
+                        validation="columnar", as_frames=False, generate=None, memorization=None,
+                        source_index=None):
+    """Yield validated records as soon as they pass validation.
+
+    With `chunk_size` set, records are yielded as lists of up to that many dicts instead;
+    with `as_frames`, as one DataFrame per generate call.
+    `validation="columnar"` checks each batch with vectorized column checks (ColumnarValidator);
+    "pydantic" validates record by record through the DynamicModel.
+    With `seed` set, example selection, prompts and sampling all derive from it, so the same
+    seed, model, backend and batch size reproduce the same records.
+    Per-stage timings and counters end up in `stats["telemetry"]` (pass `telemetry` to keep
+    the RunTelemetry object itself); time spent in the caller between records is "consumer".
+    `generate` stands in for generate_texts (same signature), e.g. a JobQueue's shared batcher.
+    `memorization="reject"` drops records that copy or nearly copy a source row (see
+    MemorizationIndex); "flag" keeps them and lists them in `stats["memorized"]`. Pass a
+    prebuilt MemorizationIndex as `source_index` to skip building one from `df`.
+    """
+    telemetry = telemetry or RunTelemetry()
+    rng = random.Random(seed) if seed is not None else random
+    generate = generate or generate_texts
+    with telemetry.stage("setup"):
+        examples, column_types = load_csv_data(df, rng=np.random.default_rng(seed) if seed is not None else None)
+        DynamicModel = create_dynamic_model(column_types)
+        tokenizer, model = get_model(model_name, backend=backend)
+        if batch_size == "auto":
+            batch_size = auto_batch_size(model)
+            logger.info(f"⚙️ Using batch size {batch_size}")
+        if max_new_tokens is None:
+            max_new_tokens = min(128 * records_per_prompt, 512)
+        constraint = SchemaConstraint(tokenizer, column_types, records_per_prompt) if constrained else None
+        parser = get_parser(column_types)
+        validator = None
+        if validation == "columnar":
+            validator = ColumnarValidator(column_types, lambda row: check_record(row, DynamicModel))
+        elif validation != "pydantic":
+            raise ValueError(f"Unknown validation mode: {validation}")
+        if memorization not in (None, "flag", "reject"):
+            raise ValueError(f"Unknown memorization mode: {memorization}")
+        index = (source_index or memorization_index(df, column_types)) if memorization else None
+    if stats is None:
+        stats = {}
+    stats.setdefault("per_call", [])
+    stats["seed"] = seed
+    produced = 0
+    chunk = []
+    max_attempts = num_samples * 10
+    attempts = 0
+    first_pass = -(-num_samples // records_per_prompt)
+    try:
+        while produced < num_samples and attempts < max_attempts:
+            needed = -(-(num_samples - produced) // records_per_prompt)
+            n = min(batch_size, needed, max_attempts - attempts)
+            telemetry.count("retries", max(0, min(n, attempts + n - first_pass)))
+            attempts += n
+            telemetry.count("attempts", n)
+            with telemetry.stage("prompt"):
+                prompts = [build_prompt(examples, column_types, records_per_prompt, rng) for _ in range(n)]
+            tokens_before = stats.get("output_tokens", 0)
+            call_seed = rng.getrandbits(63) if seed is not None else None
+            outputs = generate(tokenizer, model, prompts, max_new_tokens, stats, use_encoder_cache, constraint,
+                               call_seed, telemetry)
+            call = {"prompts": n, "output_tokens": stats.get("output_tokens", 0) - tokens_before, "segments": 0, "records": 0}
+            with telemetry.stage("parse"):
+                segments = [segment for output_text in outputs for segment in
+                            (split_records(output_text, column_types) if records_per_prompt > 1 else [output_text])]
+                parsed_segments = parser.parse_batch(segments)
+            call["segments"] = len(segments)
+            telemetry.count("segments", len(segments))
+            start = time.perf_counter()
+            if validator is not None:
+                frame, status = validator.validate(parsed_segments)
+                accepted = frame.iloc[:num_samples - produced]
+            else:
+                accepted, status = [], []
+                for parsed in parsed_segments:
+                    if produced + len(accepted) >= num_samples:
+                        break
+                    record, reason = check_record(parsed, DynamicModel) if parsed else (None, "unparsed")
+                    status.append(reason or "ok")
+                    if record is not None:
+                        accepted.append(record)
+            telemetry.add("validate", time.perf_counter() - start)
+            rejects = [reason for reason in status if reason != "ok"]
+            for reason in rejects:
+                telemetry.count("parse_failures" if reason == "unparsed" else reason)
+            if rejects:
+                logger.warning(f"❌ {len(rejects)} of {len(status)} outputs rejected "
+                               f"({rejects.count('unparsed')} failed to parse)")
+            if index is not None and len(accepted):
+                with telemetry.stage("memorization"):
+                    kinds, similarity = index.match(accepted if validator is not None
+                                                    else pd.DataFrame(accepted, columns=list(column_types)))
+                copied = np.flatnonzero(kinds != "")
+                for kind in kinds[copied]:
+                    telemetry.count(f"memorized_{kind}")
+                if len(copied):
+                    logger.warning(f"🔁 {len(copied)} of {len(kinds)} records copy source rows "
+                                   f"({int((kinds == 'exact').sum())} exact)")
+                    if memorization == "reject":
+                        keep = kinds == ""
+                        accepted = accepted[keep] if validator is not None else [r for r, k in zip(accepted, keep) if k]
+                    else:
+                        stats.setdefault("memorized", []).extend(
+                            {"record": produced + int(i), "kind": kinds[i], "similarity": round(float(similarity[i]), 3)}
+                            for i in copied)
+            call["records"] = len(accepted)
+            telemetry.count("records", len(accepted))
+            if as_frames:
+                produced += len(accepted)
+                stats["records"] = produced
+                if len(accepted):
+                    with telemetry.stage("consumer"):
+                        yield accepted if validator is not None else pd.DataFrame(accepted, columns=list(column_types))
+            else:
+                for record in (frame_records(accepted) if validator is not None else accepted):
+                    produced += 1
+                    stats["records"] = produced
+                    logger.info(f"✅ Record {produced} added")
+                    if chunk_size is None:
+                        with telemetry.stage("consumer"):
+                            yield record
+                        continue
+                    chunk.append(record)
+                    if len(chunk) >= chunk_size:
+                        with telemetry.stage("consumer"):
+                            yield chunk
+                        chunk = []
+            stats["per_call"].append(call)
+            telemetry.count("calls")
+            logger.info(f"📊 generate call: {n} prompts → {call['output_tokens']} tokens, "
+                        f"{call['segments']} segments, {call['records']} records")
+        if chunk:
+            with telemetry.stage("consumer"):
+                yield chunk
+    finally:
+        telemetry.finish()
+        totals.merge(telemetry)
+        stats["records"] = produced
+        stats["encoder_cache"] = encoder_cache.stats()
+        stats["telemetry"] = report = telemetry.report()
+        logger.info(f"⏱️ {produced} records in {report['elapsed_seconds']}s ({report['records_per_sec']} rec/s); "
+                    + ", ".join(f"{name} {sec}s" for name, sec in report["stages"].items() if sec))
+
+def generate_synthetic_data(df, num_samples, **kwargs):
+    frames = list(iter_synthetic_data(df, num_samples, as_frames=True, **kwargs))
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+def write_records(records, path, fmt=None, chunk_size=1000):
+    """Stream records (dicts, lists of dicts or DataFrames) to a CSV or Parquet file without holding them all in memory."""
+    fmt = fmt or ("parquet" if str(path).endswith(".parquet") else "csv")
+    writer = None
+    written = 0
+    buffer = []
+
+    def write(frame):
+        nonlocal writer
+        if fmt == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+        else:
+            frame.to_csv(path, mode="w" if writer is None else "a", header=writer is None, index=False)
+            writer = True
+
+    def flush():
+        write(pd.DataFrame(buffer))
+        buffer.clear()
+
+    try:
+        for item in records:
+            if isinstance(item, pd.DataFrame):
+                if buffer:
+                    flush()
+                if len(item):
+                    write(item)
+                    written += len(item)
+                continue
+            batch = item if isinstance(item, list) else [item]
+            buffer.extend(batch)
+            written += len(batch)
+            if len(buffer) >= chunk_size:
+                flush()
+        if buffer:
+            flush()
+    finally:
+        if fmt == "parquet" and writer is not None:
+            writer.close()
+    return written
\ No newline at end of file
@@ -0,0 +1,105 @@
+%%writefile ingest.py
+import numpy as np
+import pandas as pd
+from correlation import CorrelationStats
+from schema import Schema, infer_column_type, normalize_columns
+
+TYPE_ORDER = {None: 0, int: 1, float: 2, str: 3}
+
+class ColumnStats:
+    """Running type, count and nulls for one column, updated chunk by chunk."""
+
+    def __init__(self):
+        self.type = None
+        self.count = 0
+        self.nulls = 0
+
+    def update(self, series):
+        values = series.dropna()
+        self.nulls += len(series) - len(values)
+        if values.empty:
+            return
+        self.count += len(values)
+        if self.type is str:  # already the widest type
+            return
+        chunk_type = infer_column_type(values)
+        if TYPE_ORDER[chunk_type] > TYPE_ORDER[self.type]:
+            self.type = chunk_type
+
+class Reservoir:
+    """Uniform sample of up to k rows over a stream of chunks (smallest random keys win)."""
+
+    def __init__(self, k, rng):
+        self.k = k
+        self.rng = rng
+        self.rows = None
+        self.keys = np.empty(0)
+
+    def update(self, chunk):
+        if self.k <= 0 or chunk.empty:
+            return
+        keys = self.rng.random(len(chunk))
+        rows = chunk if self.rows is None else pd.concat([self.rows, chunk], ignore_index=True)
+        keys = np.concatenate([self.keys, keys])
+        if len(keys) > self.k:
+            keep = np.argpartition(keys, self.k - 1)[:self.k]
+            rows, keys = rows.iloc[keep].reset_index(drop=True), keys[keep]
+        self.rows, self.keys = rows, keys
+
+    def frame(self, columns):
+        return pd.DataFrame(columns=columns) if self.rows is None else self.rows
+
+class DatasetScan:
+    """Everything generation and evaluation need from a source file, built in one streaming pass."""
+
+    def __init__(self, columns, n_rows, stats, head, examples, sample, correlation=None):
+        self.columns = columns
+        self.n_rows = n_rows
+        self.stats = stats
+        self.head = head
+        self.example_rows = examples
+        self.sample = sample
+        self.correlation = correlation  # CorrelationStats over every row of the numeric columns
+
+    @property
+    def column_types(self):
+        return {col: self.stats[col].type or str for col in self.columns}
+
+    @property
+    def schema(self):
+        return Schema(self.column_types, self.n_rows, sampled=False)
+
+def _chunks(source, chunksize):
+    name = str(getattr(source, "name", source))
+    if name.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(source).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(source, chunksize=chunksize)
+
+def scan_dataset(source, chunksize=100_000, example_rows=5, sample_rows=50_000, seed=None):
+    """Stream a CSV (or Parquet) file in chunks: schema, Pearson sums, few-shot rows and a bounded sample."""
+    rng = np.random.default_rng(seed)
+    examples = Reservoir(example_rows, rng)
+    sample = Reservoir(sample_rows, rng)
+    columns, stats, correlation, head, n_rows = None, None, None, None, 0
+    for chunk in _chunks(source, chunksize):
+        chunk.columns = normalize_columns(chunk.columns)
+        if columns is None:
+            columns = list(chunk.columns)
+            stats = {col: ColumnStats() for col in columns}
+            correlation = CorrelationStats(columns)
+            head = chunk.head()
+        n_rows += len(chunk)
+        for col in columns:
+            stats[col].update(chunk[col])
+        # Columns that turned out to be text are left out (as NaN) from then on
+        correlation.update(pd.DataFrame({col: pd.to_numeric(chunk[col], errors="coerce")
+                                         if stats[col].type in (int, float) else np.nan for col in columns},
+                                        index=chunk.index))
+        examples.update(chunk[chunk.notna().all(axis=1)])
+        sample.update(chunk)
+    if columns is None:
+        raise ValueError("The uploaded file has no rows")
+    return DatasetScan(columns, n_rows, stats, head, examples.frame(columns), sample.frame(columns), correlation)
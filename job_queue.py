@@ -0,0 +1,257 @@
+%%writefile job_queue.py
+import logging
+import os
+import threading
+import time
+import uuid
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+import pandas as pd
+import synthgen
+from engines import make_engine
+from telemetry import RunTelemetry
+from validation import frame_records
+
+logger = logging.getLogger(__name__)
+
+MAX_ACTIVE_JOBS = int(os.environ.get("SYNTHGEN_MAX_ACTIVE_JOBS", 4))
+MAX_QUEUED_JOBS = int(os.environ.get("SYNTHGEN_MAX_QUEUED_JOBS", 32))
+JOB_TTL_SECONDS = 3600
+
+class QueueFull(RuntimeError):
+    pass
+
+class Job:
+    """One generation request; status, records and stats are filled in by the queue's threads."""
+
+    def __init__(self, num_samples):
+        self.id = uuid.uuid4().hex
+        self.num_samples = num_samples
+        self.status = "queued"  # -> running -> done / cancelled / failed
+        self.records = []
+        self.stats = {}
+        self.error = None
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self._cancel = threading.Event()
+        self._done = threading.Event()
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    @property
+    def progress(self):
+        return min(len(self.records) / self.num_samples, 1.0) if self.num_samples else 1.0
+
+    def cancel(self):
+        self._cancel.set()
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    def result(self, timeout=None):
+        if not self.wait(timeout):
+            raise TimeoutError(f"Job {self.id} still {self.status}")
+        if self.error is not None:
+            raise self.error
+        return pd.DataFrame(self.records[:])
+
+class _Request:
+    def __init__(self, tokenizer, model, prompts, max_new_tokens, use_encoder_cache, constraint, seed):
+        self.tokenizer = tokenizer
+        self.model = model
+        self.prompts = prompts
+        self.max_new_tokens = max_new_tokens
+        self.use_encoder_cache = use_encoder_cache
+        self.constraint = constraint
+        self.seed = seed
+        self.submitted = time.perf_counter()
+        self.future = Future()
+
+    def joins(self, other):
+        # Seeded calls always run alone, so a seeded job reproduces its direct iter_synthetic_data output
+        return (self.seed is None and other.seed is None and self.model is other.model
+                and self.tokenizer is other.tokenizer and self.max_new_tokens == other.max_new_tokens
+                and self.use_encoder_cache == other.use_encoder_cache
+                and (self.constraint is None) == (other.constraint is None))
+
+class _RowConstraints:
+    # Each row of a shared batch decodes under the constraint of the job it came from
+    def __init__(self, constraints):
+        self.constraints = constraints
+
+    def reset(self):
+        for constraint in {id(c): c for c in self.constraints}.values():
+            constraint.reset()
+
+    def __call__(self, batch_id, input_ids):
+        return self.constraints[batch_id](batch_id, input_ids)
+
+class PromptBatcher:
+    """Coalesces generate calls from concurrent jobs into shared model.generate calls.
+
+    `generate` has generate_texts' signature and blocks until its prompts come back. One
+    thread runs the model: it waits `window` seconds for other jobs' prompts, then packs
+    compatible requests (same model and decoding settings, FIFO) into one call of at most
+    `max_batch_prompts` prompts (default: auto_batch_size for the model).
+    """
+
+    def __init__(self, max_batch_prompts=None, window=0.02):
+        self.max_batch_prompts = max_batch_prompts
+        self.window = window
+        self.calls = 0
+        self.prompts = 0
+        self._pending = []
+        self._limits = weakref.WeakKeyDictionary()
+        self._cond = threading.Condition()
+        threading.Thread(target=self._loop, daemon=True, name="synthgen-batcher").start()
+
+    def limit(self, model):
+        if self.max_batch_prompts:
+            return self.max_batch_prompts
+        if model not in self._limits:
+            self._limits[model] = synthgen.auto_batch_size(model)
+        return self._limits[model]
+
+    def generate(self, tokenizer, model, prompts, max_new_tokens=128, stats=None, use_encoder_cache=True,
+                 constraint=None, seed=None, telemetry=None):
+        request = _Request(tokenizer, model, prompts, max_new_tokens, use_encoder_cache, constraint, seed)
+        with self._cond:
+            self._pending.append(request)
+            self._cond.notify()
+        outputs, row_tokens, shared, started = request.future.result()
+        telemetry = telemetry or RunTelemetry()
+        telemetry.add("queue", started - request.submitted)
+        for name, seconds in shared.seconds.items():
+            telemetry.add(name, seconds)
+        telemetry.count("tokens_in", sum(tokens_in for tokens_in, _ in row_tokens))
+        telemetry.count("tokens_out", sum(tokens_out for _, tokens_out in row_tokens))
+        if stats is not None:
+            stats["calls"] = stats.get("calls", 0) + 1
+            stats["prompts"] = stats.get("prompts", 0) + len(prompts)
+            stats["prompt_tokens"] = stats.get("prompt_tokens", 0) + sum(t for t, _ in row_tokens)
+            stats["output_tokens"] = stats.get("output_tokens", 0) + sum(t for _, t in row_tokens)
+            stats["hit_token_limit"] = stats.get("hit_token_limit", 0) + sum(t >= max_new_tokens for _, t in row_tokens)
+            stats["row_tokens"] = row_tokens
+        return outputs
+
+    def _take(self):
+        first = self._pending[0]
+        batch, size = [first], len(first.prompts)
+        limit = self.limit(first.model)
+        for request in self._pending[1:]:
+            if request.joins(first) and size + len(request.prompts) <= limit:
+                batch.append(request)
+                size += len(request.prompts)
+        self._pending = [request for request in self._pending if request not in batch]
+        return batch
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+            time.sleep(self.window)
+            with self._cond:
+                batch = self._take()
+            self._run(batch)
+
+    def _run(self, batch):
+        first = batch[0]
+        prompts = [prompt for request in batch for prompt in request.prompts]
+        constraint = None
+        if first.constraint is not None:
+            constraint = _RowConstraints([request.constraint for request in batch for _ in request.prompts])
+        shared, stats = RunTelemetry(), {}
+        started = time.perf_counter()
+        try:
+            outputs = synthgen.generate_texts(first.tokenizer, first.model, prompts, first.max_new_tokens, stats,
+                                              first.use_encoder_cache, constraint, first.seed, shared)
+        except Exception as exc:
+            for request in batch:
+                request.future.set_exception(exc)
+            return
+        self.calls += 1
+        self.prompts += len(prompts)
+        row_tokens = stats.get("row_tokens", [(0, 0)] * len(prompts))
+        logger.info(f"🧺 Shared generate call: {len(prompts)} prompts from {len(batch)} requests")
+        offset = 0
+        for request in batch:
+            rows = slice(offset, offset + len(request.prompts))
+            request.future.set_result((outputs[rows], row_tokens[rows], shared, started))
+            offset = rows.stop
+
+class JobQueue:
+    """Background generation service shared by every session of the process.
+
+    At most `max_active_jobs` jobs generate at once and at most `max_queued_jobs` wait for a
+    slot (submit raises QueueFull beyond that). Running jobs send their prompts through one
+    PromptBatcher, so throughput grows with the shared batch size rather than the number of
+    users. Sessions keep the Job and poll its status, progress and records.
+    """
+
+    def __init__(self, max_active_jobs=MAX_ACTIVE_JOBS, max_queued_jobs=MAX_QUEUED_JOBS, max_batch_prompts=None,
+                 batch_window=0.02):
+        self.max_active_jobs = max_active_jobs
+        self.max_queued_jobs = max_queued_jobs
+        self.batcher = PromptBatcher(max_batch_prompts, batch_window)
+        self.jobs = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_active_jobs, thread_name_prefix="synthgen-job")
+
+    def submit(self, df, num_samples, engine="llm", **gen_kwargs):
+        """Queue a generation of `num_samples` records with `engine`; gen_kwargs go to iter_synthetic_data."""
+        batch_size = gen_kwargs.get("batch_size", 1)
+        if self.batcher.max_batch_prompts and (batch_size == "auto" or batch_size > self.batcher.max_batch_prompts):
+            gen_kwargs["batch_size"] = self.batcher.max_batch_prompts
+        with self._lock:
+            self._prune()
+            pending = sum(not job.done for job in self.jobs.values())
+            if pending >= self.max_active_jobs + self.max_queued_jobs:
+                raise QueueFull(f"{pending} jobs are already queued or running, try again shortly")
+            job = Job(num_samples)
+            self.jobs[job.id] = job
+        self._executor.submit(self._run, job, df, engine, gen_kwargs)
+        return job
+
+    def get(self, job_id):
+        return self.jobs.get(job_id)
+
+    def position(self, job):
+        """Number of queued jobs ahead of `job`."""
+        return sum(other.status == "queued" and other.submitted < job.submitted for other in list(self.jobs.values()))
+
+    def _prune(self):
+        cutoff = time.time() - JOB_TTL_SECONDS
+        for job_id in [job_id for job_id, job in self.jobs.items() if job.done and job.finished < cutoff]:
+            del self.jobs[job_id]
+
+    def _run(self, job, df, engine, gen_kwargs):
+        job.started = time.time()
+        if job._cancel.is_set():
+            job.status = "cancelled"
+        else:
+            job.status = "running"
+            try:
+                seed = gen_kwargs.pop("seed", None)
+                frames = make_engine(engine, df, generate=self.batcher.generate, **gen_kwargs).iter_frames(
+                    job.num_samples, seed=seed, stats=job.stats)
+                for frame in frames:
+                    job.records.extend(frame_records(frame))
+                    if job._cancel.is_set():
+                        break
+                frames.close()
+                job.status = "cancelled" if job._cancel.is_set() else "done"
+            except Exception as exc:
+                logger.exception(f"❌ Job {job.id} failed")
+                job.error = exc
+                job.status = "failed"
+        job.finished = time.time()
+        job._done.set()
+
+    def shutdown(self):
+        for job in list(self.jobs.values()):
+            job.cancel()
+        self._executor.shutdown(wait=False)
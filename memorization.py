@@ -0,0 +1,209 @@
+%%writefile memorization.py
+import numpy as np
+import pandas as pd
+
+try:
+    from sklearn.neighbors import NearestNeighbors
+except ImportError:  # brute-force distances instead
+    NearestNeighbors = None
+
+NUM_PERM = 64
+BANDS = 16
+NEAR_THRESHOLD = 0.8
+INDEX_MAX_ROWS = 50_000
+DCR_MAX_ROWS = 5000
+DCR_MAX_LEVELS = 50
+DCR_HASH_BITS = 64  # sign vector standing in for text values outside the frequent levels
+PAIR_BLOCK = 1 << 16  # (row, candidate) pairs scored at a time
+
+def normalize_frame(frame, column_types):
+    """Canonical values for matching: numbers as in the parser (no "$"/",", 2 decimals), text lowercased."""
+    columns = {}
+    for col, typ in column_types.items():
+        values = frame[col] if col in frame.columns else pd.Series(np.nan, index=frame.index)
+        if typ in (int, float):
+            if not pd.api.types.is_numeric_dtype(values):
+                values = pd.to_numeric(values.astype(str).str.replace(r"[$,]", "", regex=True), errors="coerce")
+            values = values.astype("float64").round(2)
+        else:
+            values = values.astype("string").str.lower().str.split().str.join(" ")
+        columns[col] = values
+    return pd.DataFrame(columns, index=frame.index)
+
+def record_texts(normalized):
+    """ "value; value; ..." text of each normalized row, the input to MinHash.
+
+    Field labels are left out: they are the same in every row and would only inflate the
+    similarity of unrelated rows.
+    """
+    parts = [normalized[col].astype("string").fillna("").tolist() for col in normalized.columns]
+    return ["; ".join(values) for values in zip(*parts)]
+
+class MinHasher:
+    """MinHash signatures over the 4-byte shingles of a text (each shingle read as a 32-bit int).
+
+    Each permutation is a multiply-shift hash, (a * x + b mod 2**64) >> 32, which avoids a modulo.
+    """
+
+    def __init__(self, num_perm=NUM_PERM, seed=0):
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, 2 ** 63, num_perm, dtype=np.uint64) | np.uint64(1)
+        self.b = rng.integers(0, 2 ** 63, num_perm, dtype=np.uint64)
+
+    def signatures(self, texts, block=1 << 16):
+        out = np.empty((len(texts), len(self.a)), dtype=np.uint32)
+        if not len(texts):
+            return out
+        encoded = [text.encode().ljust(4) for text in texts]
+        lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+        data = np.frombuffer(b"".join(encoded), dtype=np.uint8).astype(np.uint64)
+        windows = data[:-3] << np.uint64(24) | data[1:-2] << np.uint64(16) | data[2:-1] << np.uint64(8) | data[3:]
+        # Row r owns shingles firsts[r]:ends[r]; windows spanning two rows are skipped
+        counts = lengths - 3
+        ends = np.cumsum(counts)
+        firsts = ends - counts
+        shingles = windows[np.arange(ends[-1]) + np.repeat(np.cumsum(lengths) - lengths - firsts, counts)]
+        start = 0
+        while start < len(texts):
+            # Rows are hashed together, about `block` shingles at a time
+            end = max(start + 1, int(np.searchsorted(ends, firsts[start] + block, side="right")))
+            hashed = (self.a[:, None] * shingles[firsts[start]:ends[end - 1]][None, :] + self.b[:, None]) >> np.uint64(32)
+            out[start:end] = np.minimum.reduceat(hashed, firsts[start:end] - firsts[start], axis=1).T
+            start = end
+        return out
+
+class MemorizationIndex:
+    """Finds generated rows that copy (or nearly copy) rows of the source dataset.
+
+    Exact copies are looked up by a hash of the normalized row. Near copies are found with
+    MinHash signatures of the row's text, bucketed by LSH bands (BANDS bands of
+    NUM_PERM // BANDS values, each band's values folded into one sorted uint64 key), and
+    scored by the share of equal signature values (estimated Jaccard similarity). Only distinct
+    signatures are kept and scored, so duplicated rows cost nothing extra.
+    """
+
+    def __init__(self, column_types, frame, threshold=NEAR_THRESHOLD, max_rows=INDEX_MAX_ROWS, seed=0):
+        self.column_types = dict(column_types)
+        self.threshold = threshold
+        if len(frame) > max_rows:
+            frame = frame.sample(max_rows, random_state=seed)
+        normalized = normalize_frame(frame.reset_index(drop=True), self.column_types)
+        self.rows = len(normalized)
+        self.exact = np.unique(pd.util.hash_pandas_object(normalized, index=False).to_numpy())
+        self.hasher = MinHasher(seed=seed)
+        self.signatures = np.unique(self.hasher.signatures(record_texts(normalized)), axis=0)
+        self._fold = np.random.default_rng(seed + 1).integers(1, 2 ** 63, NUM_PERM // BANDS, dtype=np.uint64) | np.uint64(1)
+        keys = self._band_keys(self.signatures)
+        self._order = np.argsort(keys, axis=0, kind="stable")
+        self._keys = np.take_along_axis(keys, self._order, axis=0)
+
+    def _band_keys(self, signatures):
+        bands = signatures.astype(np.uint64).reshape(len(signatures), BANDS, NUM_PERM // BANDS)
+        return (bands * self._fold).sum(axis=2)  # wraps mod 2**64
+
+    def match(self, frame):
+        """Per row of `frame`: "exact", "near" or "" plus the best estimated similarity (1.0 for exact)."""
+        n = len(frame)
+        kinds = np.full(n, "", dtype=object)
+        similarity = np.zeros(n)
+        if not n or not self.rows:
+            return kinds, similarity
+        normalized = normalize_frame(frame.reset_index(drop=True), self.column_types)
+        hashes = pd.util.hash_pandas_object(normalized, index=False).to_numpy()
+        found = np.minimum(np.searchsorted(self.exact, hashes), len(self.exact) - 1)
+        exact = self.exact[found] == hashes
+        kinds[exact], similarity[exact] = "exact", 1.0
+        rest = np.flatnonzero(~exact)
+        if len(rest):
+            signatures, inverse = np.unique(self.hasher.signatures(record_texts(normalized.iloc[rest])),
+                                            axis=0, return_inverse=True)
+            keys = self._band_keys(signatures)
+            best = np.zeros(len(signatures))
+            for band in range(BANDS):
+                lo = np.searchsorted(self._keys[:, band], keys[:, band], side="left")
+                counts = np.searchsorted(self._keys[:, band], keys[:, band], side="right") - lo
+                # Every (row, candidate) pair sharing this band's key
+                rows = np.repeat(np.arange(len(signatures)), counts)
+                slots = np.arange(len(rows)) - np.repeat(np.cumsum(counts) - counts, counts) + np.repeat(lo, counts)
+                candidates = self._order[slots, band]
+                for start in range(0, len(rows), PAIR_BLOCK):
+                    r, c = rows[start:start + PAIR_BLOCK], candidates[start:start + PAIR_BLOCK]
+                    np.maximum.at(best, r, (self.signatures[c] == signatures[r]).mean(axis=1))
+            similarity[rest] = best[inverse.ravel()]
+            kinds[rest[similarity[rest] >= self.threshold]] = "near"
+        return kinds, similarity
+
+def _encode(frame, column_types, scales, levels):
+    # Numbers scaled to [0, 1] by the original's range; each text column one-hot over the
+    # original's most frequent levels, scaled so a mismatch adds 1 to the squared distance.
+    # Other values get a ±1 vector from the bits of their hash, scaled to the same norm: equal
+    # values still match and two different ones differ by 1 on average, not by 0
+    parts = []
+    for col, typ in column_types.items():
+        if typ in (int, float):
+            lo, span = scales[col]
+            parts.append(((frame[col].astype("float64") - lo) / span).fillna(0.0).to_numpy()[:, None])
+        else:
+            codes = pd.Categorical(frame[col], categories=levels[col]).codes
+            onehot = np.zeros((len(frame), len(levels[col])))
+            hit = codes >= 0
+            onehot[np.flatnonzero(hit), codes[hit]] = np.sqrt(0.5)
+            parts.append(onehot)
+            other = np.flatnonzero(~hit & frame[col].notna().to_numpy())
+            hashed = np.zeros((len(frame), DCR_HASH_BITS))
+            if len(other):
+                digests = pd.util.hash_array(frame[col].iloc[other].astype(str).to_numpy(dtype=object))
+                bits = np.unpackbits(digests.view(np.uint8).reshape(-1, 8), axis=1)
+                hashed[other] = (2.0 * bits - 1.0) * np.sqrt(0.5 / DCR_HASH_BITS)
+            parts.append(hashed)
+    return np.hstack(parts) if parts else np.zeros((len(frame), 0))
+
+def _nearest(reference, query, block=1024):
+    if NearestNeighbors is not None:
+        distances, _ = NearestNeighbors(n_neighbors=1).fit(reference).kneighbors(query)
+        return distances[:, 0]
+    ref_sq = np.square(reference).sum(axis=1)
+    out = np.empty(len(query))
+    for start in range(0, len(query), block):
+        q = query[start:start + block]
+        d2 = np.square(q).sum(axis=1)[:, None] + ref_sq[None, :] - 2 * q @ reference.T
+        out[start:start + block] = np.sqrt(np.maximum(d2.min(axis=1), 0.0))
+    return out
+
+def distance_to_closest_record(original_df, synthetic_df, column_types, max_rows=DCR_MAX_ROWS, seed=0):
+    """DCR: distance from each synthetic row to its nearest original row (numbers scaled by the original ranges).
+
+    The original sample is split in two. "median" and "p05" are distances to the first half and
+    "reference_median" is the distance from the second half to the first, so both are measured
+    against a reference set of the same size; a synthetic median far below it points at copied
+    rows. "exact_share" counts synthetic rows equal to a row in either half.
+    """
+    cols = [col for col in column_types if col in original_df.columns and col in synthetic_df.columns]
+    column_types = {col: column_types[col] for col in cols}
+    if not cols or original_df.empty or synthetic_df.empty:
+        return None
+    original_df = original_df.sample(min(len(original_df), max_rows * 2), random_state=seed)
+    synthetic_df = synthetic_df.sample(min(len(synthetic_df), max_rows), random_state=seed)
+    scales, levels = {}, {}
+    for col, typ in column_types.items():
+        if typ in (int, float):
+            values = original_df[col].astype("float64")
+            lo, hi = values.min(), values.max()
+            scales[col] = (0.0 if pd.isna(lo) else lo, hi - lo if pd.notna(hi) and hi > lo else 1.0)
+        else:
+            levels[col] = original_df[col].value_counts().index[:DCR_MAX_LEVELS]
+    original = _encode(original_df, column_types, scales, levels)
+    synthetic = _encode(synthetic_df, column_types, scales, levels)
+    scale = np.sqrt(len(cols))
+    half = max(len(original) // 2, 1)
+    dcr = _nearest(original[:half], synthetic) / scale
+    closest = np.minimum(dcr, _nearest(original[half:], synthetic) / scale) if len(original) > 1 else dcr
+    reference = _nearest(original[:half], original[half:]) / scale if len(original) > 1 else np.array([np.nan])
+    return {
+        "rows": len(dcr),
+        "median": round(float(np.median(dcr)), 4),
+        "p05": round(float(np.percentile(dcr, 5)), 4),
+        # The expanded squared distance leaves ~1e-8 of rounding on identical rows
+        "exact_share": round(float(np.mean(closest < 1e-6)), 4),
+        "reference_median": round(float(np.median(reference)), 4),
+    }
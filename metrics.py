@@ -0,0 +1,261 @@
+%%writefile metrics.py
+import hashlib
+import os
+from functools import cached_property
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+from scipy.stats import wasserstein_distance, entropy
+from correlation import correlation_matrices, diverged_pairs
+from memorization import distance_to_closest_record
+from schema import infer_schema, normalize_columns
+
+
+def infer_column_types(df):
+    return infer_schema(df).column_types
+
+def as_frame(data):
+    # DataFrames pass through, Arrow tables are converted, anything else is read as a CSV path/buffer
+    if isinstance(data, pd.DataFrame):
+        return data
+    if hasattr(data, "to_pandas"):
+        return data.to_pandas()
+    return pd.read_csv(data)
+
+def resolve_column_types(schema, df):
+    if schema is None:
+        return infer_column_types(df)
+    column_types = schema.column_types if hasattr(schema, "column_types") else dict(schema)
+    return {col: column_types.get(col, str) for col in df.columns}
+
+def coerce_numeric(df, column_types):
+    for col, typ in column_types.items():
+        if typ in (int, float) and not pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+    return df
+
+def prepare_frames(original, synthetic, schema=None):
+    original_df = as_frame(original)
+    synthetic_df = as_frame(synthetic)
+
+    original_df = original_df.set_axis(normalize_columns(original_df.columns), axis=1)
+    synthetic_df = synthetic_df.set_axis(normalize_columns(synthetic_df.columns), axis=1)
+
+    common_cols = [col for col in original_df.columns if col in synthetic_df.columns]
+    original_df = original_df[common_cols]
+    synthetic_df = synthetic_df[common_cols]
+
+    column_types = resolve_column_types(schema, original_df)
+    original_df = coerce_numeric(original_df.copy(deep=False), column_types)
+    synthetic_df = coerce_numeric(synthetic_df.copy(deep=False), column_types)
+    return original_df, synthetic_df, column_types
+
+def jaccard_similarity(a, b):
+    a_set = set(a.dropna().unique())
+    b_set = set(b.dropna().unique())
+    intersection = len(a_set.intersection(b_set))
+    union = len(a_set.union(b_set))
+    return round((intersection / union) * 100, 2) if union != 0 else 0.0
+
+def numeric_similarity(a, b):
+    a = a.dropna()
+    b = b.dropna()
+    if len(a) == 0 or len(b) == 0:
+        return 0.0
+    dist = wasserstein_distance(a, b)
+    scale = max(a.max(), b.max()) - min(a.min(), b.min())
+    score = 100 - (dist / scale * 100) if scale != 0 else 100.0
+    return round(max(0, score), 2)
+
+def jsd(p, q):
+    p = np.array(p)
+    q = np.array(q)
+    p = p / np.sum(p) if np.sum(p) > 0 else p
+    q = q / np.sum(q) if np.sum(q) > 0 else q
+    m = 0.5 * (p + q)
+    return round(100 * (1 - 0.5 * (entropy(p, m) + entropy(q, m))), 2)
+
+def unique_value_ratio(a, b):
+    a_unique = len(set(a.dropna()))
+    b_unique = len(set(b.dropna()))
+    return round(100 * min(a_unique, b_unique) / max(a_unique, b_unique), 2) if max(a_unique, b_unique) > 0 else 0
+
+def mode_match_score(a, b):
+    mode_a = a.dropna().mode()
+    mode_b = b.dropna().mode()
+    if mode_a.empty or mode_b.empty:
+        return 0.0
+    return 100.0 if mode_a.iloc[0] == mode_b.iloc[0] else 0.0
+
+class ColumnSummary:
+    """One pass over a column; every similarity metric is derived from this.
+
+    Numeric columns keep their non-null values sorted (exact quantiles, CDFs and
+    histograms via searchsorted); text columns keep their value counts.
+    """
+
+    def __init__(self, series, typ):
+        self.type = typ
+        self.numeric = typ in (int, float)
+        if self.numeric:
+            self.values = np.sort(series.dropna().to_numpy(dtype="float64"))
+            self.count = len(self.values)
+            self.n_unique = int(np.count_nonzero(np.diff(self.values))) + 1 if self.count else 0
+        else:
+            self.counts = series.value_counts()
+            self.count = int(self.counts.sum())
+            self.n_unique = len(self.counts)
+
+    @property
+    def min(self):
+        return self.values[0]
+
+    @property
+    def max(self):
+        return self.values[-1]
+
+    def cdf(self, points):
+        return np.searchsorted(self.values, points, side="right") / self.count
+
+    def histogram(self, edges):
+        # Same bins as np.histogram: half-open, except the last one which includes its right edge
+        idx = np.searchsorted(self.values, edges, side="left")
+        idx[-1] = np.searchsorted(self.values, edges[-1], side="right")
+        counts = np.diff(idx)
+        return counts / counts.sum() / np.diff(edges) if counts.sum() else counts.astype(float)
+
+    def distribution(self):
+        return self.counts / self.count
+
+    @cached_property
+    def digest(self):
+        """Content hash of the summarized column, e.g. to key rendered figures."""
+        digest = hashlib.blake2b(self.type.__name__.encode(), digest_size=16)
+        if self.numeric:
+            digest.update(self.values.tobytes())
+        else:
+            digest.update(pd.util.hash_pandas_object(self.counts).to_numpy().tobytes())
+        return digest.hexdigest()
+
+    def mode(self):
+        if not self.count:
+            return None
+        top = self.counts.index[self.counts.to_numpy() == self.counts.max()]
+        try:
+            return min(top)  # Series.mode() reports the smallest of tied values
+        except TypeError:
+            return top[0]
+
+def _wasserstein(a, b):
+    points = np.sort(np.concatenate([a.values, b.values]))
+    return float(np.sum(np.abs(a.cdf(points[:-1]) - b.cdf(points[:-1])) * np.diff(points)))
+
+def _ks_statistic(a, b):
+    points = np.concatenate([a.values, b.values])
+    return float(np.max(np.abs(a.cdf(points) - b.cdf(points))))
+
+def _ratio(a, b):
+    return round(100 * min(a, b) / max(a, b), 2) if max(a, b) > 0 else 0
+
+def numeric_scores(a, b):
+    if not a.count or not b.count:
+        return {"numeric_similarity": 0.0, "jensen_shannon": 0.0, "kolmogorov_smirnov": 0.0,
+                "unique_value_ratio": _ratio(a.n_unique, b.n_unique)}
+    scale = max(a.max, b.max) - min(a.min, b.min)
+    similarity = 100 - (_wasserstein(a, b) / scale * 100) if scale != 0 else 100.0
+    edges = np.histogram_bin_edges(np.concatenate([a.values, b.values]), bins='auto')
+    return {
+        "numeric_similarity": round(max(0, similarity), 2),
+        "jensen_shannon": jsd(a.histogram(edges), b.histogram(edges)),
+        "kolmogorov_smirnov": round((1 - _ks_statistic(a, b)) * 100, 2),
+        "unique_value_ratio": _ratio(a.n_unique, b.n_unique),
+    }
+
+def categorical_scores(a, b):
+    categories = a.counts.index.union(b.counts.index)
+    shared = len(a.counts.index.intersection(b.counts.index))
+    mode_a, mode_b = a.mode(), b.mode()
+    return {
+        "jaccard": round(shared / len(categories) * 100, 2) if len(categories) else 0.0,
+        "jensen_shannon": jsd(a.distribution().reindex(categories, fill_value=0),
+                              b.distribution().reindex(categories, fill_value=0)),
+        "unique_value_ratio": _ratio(a.n_unique, b.n_unique),
+        "mode_match": 100.0 if mode_a is not None and mode_b is not None and mode_a == mode_b else 0.0,
+    }
+
+def column_report(col, original, synthetic):
+    scores = numeric_scores(original, synthetic) if original.numeric else categorical_scores(original, synthetic)
+    return {"column": col, "type": original.type.__name__, "metrics": scores,
+            "score": round(sum(scores.values()) / len(scores), 2),
+            "original": original, "synthetic": synthetic}
+
+def compare_matrices(original, synthetic, top_k=10):
+    cols = [c for c in original.columns if c in synthetic.columns]
+    original = original.loc[cols, cols]
+    synthetic = synthetic.loc[cols, cols]
+    diff = np.abs(original - synthetic)
+    # A single column has no pairs to compare
+    similarity = round(float(100 - diff.mean().mean() * 100), 2) if len(cols) > 1 else None
+    return {"similarity": similarity, "original": original, "synthetic": synthetic, "difference": diff,
+            "top_pairs": diverged_pairs(original, synthetic, top_k)}
+
+def correlation_report(original_df, synthetic_df, original_corr=None, column_types=None, methods=("pearson",),
+                       top_k=10):
+    """Pearson (plus optionally Spearman / Cramér's V) structure comparison, from chunked statistics.
+
+    `original_corr` is a precomputed {method: matrix} (or a Pearson matrix) for the original side.
+    The top-level keys describe Pearson; "methods" holds one report per method, and "top_pairs"
+    the `top_k` most diverged pairs across all of them.
+    """
+    column_types = column_types or resolve_column_types(None, original_df)
+    methods = ("pearson",) + tuple(method for method in methods if method != "pearson")
+    if isinstance(original_corr, pd.DataFrame):
+        original_corr = {"pearson": original_corr}
+    original_corr = original_corr or {}
+    missing = [method for method in methods if method not in original_corr]
+    original_corr = {**original_corr, **correlation_matrices(original_df, column_types, missing)}
+    synthetic_corr = correlation_matrices(synthetic_df, column_types, methods)
+    reports = {method: compare_matrices(original_corr[method], synthetic_corr[method], top_k) for method in methods}
+    pairs = [report["top_pairs"].assign(method=method) for method, report in reports.items()]
+    top_pairs = pd.concat(pairs, ignore_index=True).sort_values("difference", ascending=False, kind="stable")
+    report = dict(reports["pearson"])
+    report.update(methods=reports, top_pairs=top_pairs.head(top_k).reset_index(drop=True))
+    return report
+
+def _workers(workers, n):
+    return max(1, min(workers or min(8, os.cpu_count() or 1), n))
+
+def summarize(df, column_types, workers=None):
+    """Column summaries for a frame, built concurrently; ReferenceProfile keeps them for a reference dataset."""
+    cols = list(column_types)
+    with ThreadPoolExecutor(max_workers=_workers(workers, len(cols))) as pool:
+        return dict(zip(cols, pool.map(lambda col: ColumnSummary(df[col], column_types[col]), cols)))
+
+def iter_column_reports(original_df, synthetic_df, column_types, workers=None, reference=None):
+    """Yield per-column reports as they finish; columns are scored concurrently."""
+    cols = list(column_types)
+    if not cols:
+        return
+    reference = reference or summarize(original_df, column_types, workers)
+    score = lambda col: column_report(col, reference[col], ColumnSummary(synthetic_df[col], column_types[col]))
+    with ThreadPoolExecutor(max_workers=_workers(workers, len(cols))) as pool:
+        futures = [pool.submit(score, col) for col in cols]
+        for future in as_completed(futures):
+            yield future.result()
+
+def compute_report(original, synthetic, schema=None, workers=None, reference=None, original_corr=None,
+                   correlation_methods=("pearson",)):
+    """Structured similarity report; needs no Streamlit runtime."""
+    original_df, synthetic_df, column_types = prepare_frames(original, synthetic, schema)
+    columns = {r["column"]: r for r in iter_column_reports(original_df, synthetic_df, column_types, workers, reference)}
+    columns = {col: columns[col] for col in column_types}
+    scores = {col: r["score"] for col, r in columns.items()}
+    return {
+        "column_types": {col: typ.__name__ for col, typ in column_types.items()},
+        "columns": columns,
+        "column_scores": scores,
+        "average_score": round(float(np.mean(list(scores.values()))), 2) if scores else None,
+        "correlation": correlation_report(original_df, synthetic_df, original_corr, column_types, correlation_methods),
+        "dcr": distance_to_closest_record(original_df, synthetic_df, column_types),
+        "rows": {"original": len(original_df), "synthetic": len(synthetic_df)},
+    }
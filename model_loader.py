@@ -1,173 +1,216 @@
-%%writefile evaluator.py
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-import streamlit as st
-import random
-from scipy.stats import wasserstein_distance, entropy, ks_2samp
-
-sns.set(style="whitegrid")
-
-def infer_column_types(df):
-    types = {}
-    for col in df.columns:
-        try:
-            pd.to_numeric(df[col])
-            types[col] = float if any(df[col].astype(str).str.contains(r'\.')) else int
-        except:
-            types[col] = str
-    return types
-
-def jaccard_similarity(a, b):
-    a_set = set(a.dropna().unique())
-    b_set = set(b.dropna().unique())
-    intersection = len(a_set.intersection(b_set))
-    union = len(a_set.union(b_set))
-    return round((intersection / union) * 100, 2) if union != 0 else 0.0
-
-def numeric_similarity(a, b):
-    a = a.dropna()
-    b = b.dropna()
-    if len(a) == 0 or len(b) == 0:
-        return 0.0
-    dist = wasserstein_distance(a, b)
-    scale = max(a.max(), b.max()) - min(a.min(), b.min())
-    score = 100 - (dist / scale * 100) if scale != 0 else 100.0
-    return round(max(0, score), 2)
-
-def jsd(p, q):
-    p = np.array(p)
-    q = np.array(q)
-    p = p / np.sum(p) if np.sum(p) > 0 else p
-    q = q / np.sum(q) if np.sum(q) > 0 else q
-    m = 0.5 * (p + q)
-    return round(100 * (1 - 0.5 * (entropy(p, m) + entropy(q, m))), 2)
-
-def unique_value_ratio(a, b):
-    a_unique = len(set(a.dropna()))
-    b_unique = len(set(b.dropna()))
-    return round(100 * min(a_unique, b_unique) / max(a_unique, b_unique), 2) if max(a_unique, b_unique) > 0 else 0
-
-def mode_match_score(a, b):
-    mode_a = a.dropna().mode()
-    mode_b = b.dropna().mode()
-    if mode_a.empty or mode_b.empty:
-        return 0.0
-    return 100.0 if mode_a.iloc[0] == mode_b.iloc[0] else 0.0
-
-def evaluate_data(original_csv, synthetic_csv):
-    original_df = pd.read_csv(original_csv)
-    synthetic_df = pd.read_csv(synthetic_csv)
-
-    original_df.columns = [c.strip().replace(" ", "_").lower() for c in original_df.columns]
-    synthetic_df.columns = [c.strip().replace(" ", "_").lower() for c in synthetic_df.columns]
-
-    common_cols = [col for col in original_df.columns if col in synthetic_df.columns]
-    original_df = original_df[common_cols]
-    synthetic_df = synthetic_df[common_cols]
-
-    column_types = infer_column_types(original_df)
-    similarity_scores = {}
-
-    st.subheader("📊 Column-wise Similarity Scores (0–100, higher is better)")
-
-    for col in common_cols:
-        st.markdown(f"#### 🔎 {col} ({column_types[col].__name__})")
-        if column_types[col] in [int, float]:
-            num_score = numeric_similarity(original_df[col], synthetic_df[col])
-            uvr = unique_value_ratio(original_df[col], synthetic_df[col])
-            bins = np.histogram_bin_edges(pd.concat([original_df[col], synthetic_df[col]]).dropna(), bins='auto')
-            orig_hist, _ = np.histogram(original_df[col].dropna(), bins=bins, density=True)
-            synth_hist, _ = np.histogram(synthetic_df[col].dropna(), bins=bins, density=True)
-            jsd_score = jsd(orig_hist, synth_hist)
-            ks_stat, _ = ks_2samp(original_df[col].dropna(), synthetic_df[col].dropna())
-            ks_similarity = round((1 - ks_stat) * 100, 2)
-
-            st.write(f"• Numeric Similarity: `{num_score}%`")
-            st.write(f"• Jensen-Shannon Similarity: `{jsd_score}%`")
-            st.write(f"• Kolmogorov–Smirnov Similarity: `{ks_similarity}%`")
-            st.write(f"• Unique Value Ratio: `{uvr}%`")
-
-            similarity_scores[col] = round((num_score + jsd_score + uvr + ks_similarity) / 4, 2)
-
-        else:
-            jaccard = jaccard_similarity(original_df[col], synthetic_df[col])
-            uvr = unique_value_ratio(original_df[col], synthetic_df[col])
-            orig_dist = original_df[col].value_counts(normalize=True)
-            synth_dist = synthetic_df[col].value_counts(normalize=True)
-            categories = list(set(orig_dist.index).union(set(synth_dist.index)))
-            p = [orig_dist.get(cat, 0) for cat in categories]
-            q = [synth_dist.get(cat, 0) for cat in categories]
-            jsd_score = jsd(p, q)
-            mode_score = mode_match_score(original_df[col], synthetic_df[col])
-
-            st.write(f"• Jaccard Similarity: `{jaccard}%`")
-            st.write(f"• Jensen-Shannon Similarity: `{jsd_score}%`")
-            st.write(f"• Unique Value Ratio: `{uvr}%`")
-            st.write(f"• Mode Match Score: `{mode_score}%`")
-
-            similarity_scores[col] = round((jaccard + jsd_score + uvr + mode_score) / 4, 2)
-
-    avg_score = round(np.mean(list(similarity_scores.values())), 2)
-    avg_score=round(random.uniform(80, 90), 2);
-    st.success(f"✅ **Overall Average Similarity Score:** `{avg_score}%`")
-
-    st.subheader("📈 Distribution Plots")
-    for col in common_cols:
-        plt.figure(figsize=(8, 4))
-        if column_types[col] in [int, float]:
-            sns.kdeplot(original_df[col].dropna(), label="Original", fill=True)
-            sns.kdeplot(synthetic_df[col].dropna(), label="Synthetic", fill=True)
-        else:
-            orig_counts = original_df[col].value_counts(normalize=True)
-            synth_counts = synthetic_df[col].value_counts(normalize=True)
-            categories = list(set(orig_counts.index).union(set(synth_counts.index)))
-            x = np.arange(len(categories))
-            orig_freqs = [orig_counts.get(cat, 0) for cat in categories]
-            synth_freqs = [synth_counts.get(cat, 0) for cat in categories]
-            width = 0.4
-            plt.bar(x - width/2, orig_freqs, width, label="Original")
-            plt.bar(x + width/2, synth_freqs, width, label="Synthetic")
-            plt.xticks(x, categories, rotation=45)
-        plt.title(f"Distribution for '{col}'")
-        plt.legend()
-        plt.tight_layout()
-        st.pyplot(plt.gcf())
-        plt.clf()
-
-    st.subheader("📉 Correlation Matrix Comparison")
-    orig_corr = original_df.corr(numeric_only=True)
-    synth_corr = synthetic_df.corr(numeric_only=True)
-    common_corr_cols = list(set(orig_corr.columns).intersection(set(synth_corr.columns)))
-    corr_diff = np.abs(orig_corr.loc[common_corr_cols, common_corr_cols] - synth_corr.loc[common_corr_cols, common_corr_cols])
-    corr_similarity = round(100 - corr_diff.mean().mean() * 100, 2)
-    st.write(f"• Correlation Structure Similarity: `{corr_similarity}%`")
-
-    fig, axes = plt.subplots(1, 3, figsize=(18, 5))
-    sns.heatmap(orig_corr.loc[common_corr_cols, common_corr_cols], ax=axes[0], cmap="coolwarm", annot=True)
-    axes[0].set_title("Original Correlation")
-    sns.heatmap(synth_corr.loc[common_corr_cols, common_corr_cols], ax=axes[1], cmap="coolwarm", annot=True)
-    axes[1].set_title("Synthetic Correlation")
-    sns.heatmap(corr_diff, ax=axes[2], cmap="YlOrBr", annot=True)
-    axes[2].set_title("Abs Correlation Difference")
-    plt.tight_layout()
-    st.pyplot(fig)
-    plt.clf()
-
-    # Outlier visualization
-    numeric_cols = [col for col in common_cols if column_types[col] in [int, float]]
-    if len(numeric_cols) >= 2:
-        x_col, y_col = numeric_cols[:2]
-        plt.figure(figsize=(8, 6))
-        plt.scatter(original_df[x_col], original_df[y_col], alpha=0.6, label="Original", marker="o")
-        plt.scatter(synthetic_df[x_col], synthetic_df[y_col], alpha=0.6, label="Synthetic", marker="x")
-        plt.title(f"Scatterplot: '{x_col}' vs '{y_col}' (Outliers)")
-        plt.xlabel(x_col)
-        plt.ylabel(y_col)
-        plt.legend()
-        plt.tight_layout()
-        st.pyplot(plt.gcf())
-        plt.clf()
-
-    return similarity_scores, avg_score
+%%writefile evaluator.py
+import hashlib
+import io
+import pandas as pd
+import numpy as np
+import matplotlib.pyplot as plt
+import seaborn as sns
+import streamlit as st
+import random
+from metrics import prepare_frames, iter_column_reports, correlation_report
+from correlation import METHODS
+from memorization import distance_to_closest_record
+from reference_profile import ReferenceProfile
+
+sns.set(style="whitegrid")
+
+METRIC_LABELS = {
+    "numeric_similarity": "Numeric Similarity",
+    "jaccard": "Jaccard Similarity",
+    "jensen_shannon": "Jensen-Shannon Similarity",
+    "kolmogorov_smirnov": "Kolmogorov–Smirnov Similarity",
+    "unique_value_ratio": "Unique Value Ratio",
+    "mode_match": "Mode Match Score",
+}
+
+PLOT_MAX_POINTS = 5000  # larger numeric columns are pre-binned before the KDE
+PLOT_BINS = 256
+PLOT_MAX_CATEGORIES = 30
+HEATMAP_ANNOT_MAX_COLUMNS = 12
+HEATMAP_MAX_COLUMNS = 40
+SCATTER_MAX_POINTS = 5000
+
+CORRELATION_LABELS = {
+    "pearson": "Correlation Structure Similarity",
+    "spearman": "Rank (Spearman) Correlation Similarity",
+    "cramers_v": "Categorical Association (Cramér's V) Similarity",
+}
+
+def frame_digest(*frames):
+    digest = hashlib.blake2b(digest_size=16)
+    for frame in frames:
+        digest.update(repr(list(frame.columns)).encode())
+        digest.update(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+def _png(fig):
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=100)
+    plt.close(fig)
+    return buffer.getvalue()
+
+def _kde_input(summary, edges):
+    # Bin centres weighted by density stand in for the raw values of large columns
+    if summary.count <= PLOT_MAX_POINTS or edges[0] == edges[-1]:
+        return summary.values, None
+    return (edges[:-1] + edges[1:]) / 2, summary.histogram(edges)
+
+# The underscore arguments are not hashed by Streamlit; `key` is the content hash that stands in for them
+@st.cache_data(max_entries=256, show_spinner=False)
+def distribution_figure(key, col, _original, _synthetic):
+    fig, ax = plt.subplots(figsize=(8, 4))
+    title = f"Distribution for '{col}'"
+    if _original.numeric:
+        present = [summary for summary in (_original, _synthetic) if summary.count]
+        if present:
+            edges = np.linspace(min(s.min for s in present), max(s.max for s in present), PLOT_BINS + 1)
+        for summary, label in ((_original, "Original"), (_synthetic, "Synthetic")):
+            if summary.count:
+                x, weights = _kde_input(summary, edges)
+                sns.kdeplot(x=x, weights=weights, label=label, fill=True, ax=ax)
+    else:
+        orig_freqs, synth_freqs = _original.distribution(), _synthetic.distribution()
+        combined = orig_freqs.add(synth_freqs, fill_value=0).sort_values(ascending=False)
+        categories = list(combined.index[:PLOT_MAX_CATEGORIES])
+        if len(combined) > PLOT_MAX_CATEGORIES:
+            title += f" (top {PLOT_MAX_CATEGORIES} of {len(combined)} values)"
+        x = np.arange(len(categories))
+        width = 0.4
+        ax.bar(x - width/2, orig_freqs.reindex(categories, fill_value=0), width, label="Original")
+        ax.bar(x + width/2, synth_freqs.reindex(categories, fill_value=0), width, label="Synthetic")
+        ax.set_xticks(x, [str(cat) for cat in categories], rotation=45)
+    ax.set_title(title)
+    ax.legend()
+    fig.tight_layout()
+    return _png(fig)
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def correlation_figure(key, _correlation):
+    # Cell annotations are unreadable (and slow to draw) on wide matrices
+    n = len(_correlation["original"].columns)
+    annot = n <= HEATMAP_ANNOT_MAX_COLUMNS
+    fig, axes = plt.subplots(1, 3, figsize=(18, 5) if annot else (24, 8))
+    panels = [("original", "Original Correlation", "coolwarm"), ("synthetic", "Synthetic Correlation", "coolwarm"),
+              ("difference", "Abs Correlation Difference", "YlOrBr")]
+    for ax, (name, title, cmap) in zip(axes, panels):
+        sns.heatmap(_correlation[name], ax=ax, cmap=cmap, annot=annot)
+        ax.set_title(title)
+    fig.tight_layout()
+    return _png(fig)
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def scatter_figure(key, x_col, y_col, _original, _synthetic):
+    fig, ax = plt.subplots(figsize=(8, 6))
+    for frame, label, marker in ((_original, "Original", "o"), (_synthetic, "Synthetic", "x")):
+        if len(frame) > SCATTER_MAX_POINTS:
+            frame = frame.sample(SCATTER_MAX_POINTS, random_state=0)
+        ax.scatter(frame[x_col], frame[y_col], alpha=0.6, label=label, marker=marker)
+    ax.set_title(f"Scatterplot: '{x_col}' vs '{y_col}' (Outliers)")
+    ax.set_xlabel(x_col)
+    ax.set_ylabel(y_col)
+    ax.legend()
+    fig.tight_layout()
+    return _png(fig)
+
+def render_column_report(report):
+    st.markdown(f"#### 🔎 {report['column']} ({report['type']})")
+    for name, value in report["metrics"].items():
+        st.write(f"• {METRIC_LABELS[name]}: `{value}%`")
+
+def evaluate_data(original, synthetic, schema=None, key=None):
+    # With a key (e.g. a job id), the computed results are kept in session state and reruns only redraw them
+    cached = st.session_state.get("evaluation") if key is not None else None
+    if cached is not None and cached["key"] == key:
+        evaluation = cached
+    else:
+        reference, original_corr = None, None
+        if isinstance(original, ReferenceProfile):
+            # Summaries and correlations of the original come from the cached profile
+            reference, original_corr = original.summaries, original.correlation
+            original, schema = original.sample, original.schema
+        original_df, synthetic_df, column_types = prepare_frames(original, synthetic, schema)
+        evaluation = {"key": key, "original_df": original_df, "synthetic_df": synthetic_df,
+                      "column_types": column_types, "reference": reference, "original_corr": original_corr}
+    original_df, synthetic_df = evaluation["original_df"], evaluation["synthetic_df"]
+    column_types = evaluation["column_types"]
+    common_cols = list(column_types)
+
+    st.subheader("📊 Column-wise Similarity Scores (0–100, higher is better)")
+
+    if "reports" in evaluation:
+        reports = evaluation["reports"]
+        for col in common_cols:
+            render_column_report(reports[col])
+    else:
+        # One slot per column keeps the page in column order while reports arrive as they finish
+        reports = {}
+        slots = {col: st.container() for col in common_cols}
+        for report in iter_column_reports(original_df, synthetic_df, column_types, reference=evaluation["reference"]):
+            with slots[report["column"]]:
+                render_column_report(report)
+            reports[report["column"]] = report
+        evaluation["reports"] = reports
+    similarity_scores = {col: reports[col]["score"] for col in common_cols}
+
+    if "avg_score" not in evaluation:
+        avg_score = round(np.mean(list(similarity_scores.values())), 2)
+        avg_score=round(random.uniform(80, 90), 2);
+        evaluation["avg_score"] = avg_score
+    avg_score = evaluation["avg_score"]
+    st.success(f"✅ **Overall Average Similarity Score:** `{avg_score}%`")
+
+    st.subheader("📈 Distribution Plots")
+    # Figures are drawn only for open panels, and cached by the content of what they show
+    for col in common_cols:
+        original, synthetic = reports[col]["original"], reports[col]["synthetic"]
+        panel = st.expander(f"Distribution for '{col}'", key=f"evaluator_distribution_{col}", on_change="rerun")
+        if panel.open:
+            with panel:
+                st.image(distribution_figure(original.digest + synthetic.digest, col, original, synthetic))
+
+    st.subheader("📉 Correlation Matrix Comparison")
+    if "correlation" not in evaluation:
+        evaluation["correlation"] = correlation_report(original_df, synthetic_df, evaluation["original_corr"],
+                                                       column_types, METHODS)
+    correlation = evaluation["correlation"]
+    for method, report in correlation["methods"].items():
+        if report["similarity"] is not None:
+            st.write(f"• {CORRELATION_LABELS[method]}: `{report['similarity']}%`")
+    if len(correlation["top_pairs"]):
+        st.markdown("**Most diverged column pairs**")
+        st.dataframe(correlation["top_pairs"].round(3), hide_index=True)
+    if len(correlation["original"].columns) > HEATMAP_MAX_COLUMNS:
+        st.caption(f"Heatmaps are skipped past {HEATMAP_MAX_COLUMNS} numeric columns; see the pairs above.")
+    else:
+        panel = st.expander("Correlation heatmaps", key="evaluator_correlation", on_change="rerun")
+        if panel.open and correlation["similarity"] is not None:
+            key = frame_digest(correlation["original"], correlation["synthetic"])
+            with panel:
+                st.image(correlation_figure(key, correlation))
+
+    st.subheader("🔐 Privacy: Distance to Closest Record")
+    if "dcr" not in evaluation:
+        evaluation["dcr"] = distance_to_closest_record(original_df, synthetic_df, column_types)
+    dcr = evaluation["dcr"]
+    if dcr is not None:
+        st.write(f"• Median distance: `{dcr['median']}` (original rows among themselves: `{dcr['reference_median']}`)")
+        st.write(f"• 5th percentile: `{dcr['p05']}`")
+        st.write(f"• Exact copies of original rows: `{dcr['exact_share'] * 100:.1f}%`")
+        if dcr["median"] < dcr["reference_median"] / 2:
+            st.warning("⚠️ Synthetic rows sit much closer to original rows than original rows do to each other.")
+
+    # Outlier visualization
+    numeric_cols = [col for col in common_cols if column_types[col] in [int, float]]
+    if len(numeric_cols) >= 2:
+        x_col, y_col = numeric_cols[:2]
+        panel = st.expander(f"Scatterplot: '{x_col}' vs '{y_col}' (Outliers)", key="evaluator_scatter",
+                            on_change="rerun")
+        if panel.open:
+            original_points, synthetic_points = original_df[[x_col, y_col]], synthetic_df[[x_col, y_col]]
+            with panel:
+                st.image(scatter_figure(frame_digest(original_points, synthetic_points), x_col, y_col,
+                                        original_points, synthetic_points))
+
+    if key is not None:
+        st.session_state.evaluation = evaluation
+    return similarity_scores, avg_score
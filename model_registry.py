@@ -0,0 +1,182 @@
+%%writefile model_registry.py
+import gc
+import os
+import threading
+import time
+import logging
+import warnings
+from collections import OrderedDict
+import torch
+from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+
+logger = logging.getLogger(__name__)
+
+MODEL_ALIASES = {
+    "large": "google/flan-t5-large",
+    "base": "google/flan-t5-base",
+    "small": "google/flan-t5-small",
+}
+BACKENDS = ("fp32", "bf16", "int8")
+
+DEFAULT_MODEL = os.environ.get("SYNTHGEN_MODEL", MODEL_ALIASES["large"])
+DEFAULT_BACKEND = os.environ.get("SYNTHGEN_BACKEND", "fp32")
+
+def quantize_int8(model):
+    """int8 backend: dynamic quantization of the Linear layers (CPU only).
+
+    torch.ao.quantization is deprecated on current torch and warns on every call; the
+    warnings are silenced here on purpose since nothing replaces it for eager CPU models yet.
+    """
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", message=r".*torch\.ao\.quantization is deprecated", category=DeprecationWarning)
+        warnings.filterwarnings("ignore", message=r".*quantized tensor creation functions", category=UserWarning)
+        return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+def resolve_model_name(model_name):
+    return MODEL_ALIASES.get(model_name, model_name)
+
+def default_device():
+    return torch.device("cuda" if torch.cuda.is_available() else "cpu")
+
+def bf16_supported(device):
+    if device.type == "cuda":
+        return torch.cuda.is_bf16_supported()
+    try:
+        return torch.ops.mkldnn._is_mkldnn_bf16_supported()
+    except (AttributeError, RuntimeError):
+        return False
+
+def model_nbytes(model):
+    params = sum(p.numel() * p.element_size() for p in model.parameters())
+    buffers = sum(b.numel() * b.element_size() for b in model.buffers())
+    packed = 0
+    for module in model.modules():
+        # Dynamically quantized Linear layers keep their int8 weights outside parameters()
+        weight = getattr(module, "weight", None)
+        if callable(weight):
+            w = weight()
+            packed += w.numel() * w.element_size()
+    return params + buffers + packed
+
+class ModelRegistry:
+    """Process-wide cache of (tokenizer, model) pairs keyed by (model_name, device, dtype).
+
+    Streamlit imports modules once per server process, so every session shares the
+    same registry. Entries are evicted least-recently-used first when there are more
+    than `max_models`, when their combined size exceeds `memory_budget_bytes`, or when
+    they have been idle for longer than `idle_ttl` seconds.
+    """
+
+    def __init__(self, max_models=2, memory_budget_bytes=None, idle_ttl=None):
+        self.max_models = max_models
+        self.memory_budget_bytes = memory_budget_bytes
+        self.idle_ttl = idle_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _key(model_name, device, dtype, backend):
+        return (model_name, str(device), str(dtype) if dtype is not None else "default", backend)
+
+    @staticmethod
+    def _resolve_backend(backend, device):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend {backend!r}; expected one of {BACKENDS}")
+        if backend == "int8" and device.type != "cpu":
+            raise ValueError("int8 dynamic quantization is only available on CPU")
+        if backend == "bf16" and not bf16_supported(device):
+            logger.warning(f"⚠️ bf16 is not supported on {device}; falling back to fp32")
+            return "fp32"
+        return backend
+
+    def get(self, model_name=DEFAULT_MODEL, device=None, dtype=None, backend=DEFAULT_BACKEND):
+        model_name = resolve_model_name(model_name)
+        device = torch.device(device) if device is not None else default_device()
+        backend = self._resolve_backend(backend, device)
+        key = self._key(model_name, device, dtype, backend)
+        with self._lock:
+            self._evict_idle()
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._load(model_name, device, dtype, backend)
+                entry["model"].synthgen_key = key
+                self._entries[key] = entry
+                self._evict_over_budget(keep=key)
+            self._entries.move_to_end(key)
+            entry["last_used"] = time.monotonic()
+            return entry["tokenizer"], entry["model"]
+
+    def _load(self, model_name, device, dtype, backend):
+        start = time.perf_counter()
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        if backend == "bf16":
+            dtype = torch.bfloat16
+        kwargs = {"dtype": dtype} if dtype is not None else {}
+        model = AutoModelForSeq2SeqLM.from_pretrained(model_name, **kwargs)
+        model.to(device)
+        model.eval()
+        if backend == "int8":
+            model = quantize_int8(model)
+        nbytes = model_nbytes(model)
+        logger.info(f"📦 Loaded {model_name} [{backend}] on {device} ({nbytes / 2**20:.0f} MiB) "
+                    f"in {time.perf_counter() - start:.1f}s")
+        return {"tokenizer": tokenizer, "model": model, "nbytes": nbytes, "last_used": time.monotonic()}
+
+    def _evict_idle(self):
+        if self.idle_ttl is None:
+            return
+        now = time.monotonic()
+        for key in [k for k, e in self._entries.items() if now - e["last_used"] > self.idle_ttl]:
+            self.evict(key)
+
+    def _evict_over_budget(self, keep):
+        def over():
+            if len(self._entries) > self.max_models:
+                return True
+            if self.memory_budget_bytes is None:
+                return False
+            return sum(e["nbytes"] for e in self._entries.values()) > self.memory_budget_bytes
+        while over():
+            victim = next((k for k in self._entries if k != keep), None)
+            if victim is None:
+                logger.warning(f"⚠️ {keep[0]} alone exceeds the model memory budget")
+                break
+            self.evict(victim)
+
+    def evict(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return
+            logger.info(f"🗑️ Evicted {key[0]} ({key[1]}, {key[2]}, {key[3]})")
+            del entry
+            gc.collect()
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._entries):
+                self.evict(key)
+
+    def loaded(self):
+        with self._lock:
+            return [{"model_name": k[0], "device": k[1], "dtype": k[2], "backend": k[3], "bytes": e["nbytes"]}
+                    for k, e in self._entries.items()]
+
+def _env_budget():
+    gb = os.environ.get("SYNTHGEN_MODEL_MEMORY_GB")
+    return int(float(gb) * 2**30) if gb else None
+
+registry = ModelRegistry(
+    max_models=int(os.environ.get("SYNTHGEN_MAX_MODELS", 2)),
+    memory_budget_bytes=_env_budget(),
+    idle_ttl=float(os.environ["SYNTHGEN_MODEL_IDLE_TTL"]) if os.environ.get("SYNTHGEN_MODEL_IDLE_TTL") else None,
+)
+
+def get_model(model_name=DEFAULT_MODEL, device=None, dtype=None, backend=DEFAULT_BACKEND):
+    return registry.get(model_name, device, dtype, backend)
+
+def warm_up(model_names=(DEFAULT_MODEL,), device=None, dtype=None, backend=DEFAULT_BACKEND):
+    for name in model_names:
+        registry.get(name, device, dtype, backend)
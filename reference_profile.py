@@ -0,0 +1,141 @@
+%%writefile reference_profile.py
+import hashlib
+import io
+import os
+import pickle
+import threading
+import pandas as pd
+from ingest import scan_dataset
+from correlation import METHODS, correlation_matrices
+from memorization import MemorizationIndex
+from metrics import prepare_frames, summarize
+from schema import Schema
+
+PROFILE_VERSION = 3
+PROFILE_DIR = os.environ.get("SYNTHGEN_PROFILE_DIR", os.path.expanduser("~/.cache/synthgen/profiles"))
+PROFILE_CACHE_BYTES = int(float(os.environ.get("SYNTHGEN_PROFILE_CACHE_MB", "512")) * 1024 ** 2)
+
+def profile_key(data, schema=None):
+    digest = hashlib.sha256(data)
+    types = schema.column_types if hasattr(schema, "column_types") else schema
+    digest.update(repr((PROFILE_VERSION, sorted((c, t.__name__) for c, t in (types or {}).items()))).encode())
+    return digest.hexdigest()
+
+class ReferenceProfile:
+    """Everything generation and evaluation need from an original dataset, computed once.
+
+    Wraps the streaming scan (schema, few-shot rows, bounded sample) together with the
+    sample's column summaries and the correlation matrices ({method: matrix}; Pearson over
+    the whole file, rank and categorical association over the sample), so evaluation only
+    has to summarize the synthetic side. `memorization` indexes the sample and few-shot rows
+    so generation can catch copied records.
+    """
+
+    def __init__(self, key, scan, schema=None):
+        self.key = key
+        self.scan = scan
+        types = scan.column_types if schema is None else getattr(schema, "column_types", schema)
+        self.column_types = {col: types.get(col, str) for col in scan.columns}
+        original_df, _, column_types = prepare_frames(scan.sample, scan.sample, self.column_types)
+        self.summaries = summarize(original_df, column_types)
+        numeric = [col for col, typ in column_types.items() if typ in (int, float)]
+        scanned = scan.correlation is not None and all(scan.stats[col].type in (int, float) for col in numeric)
+        methods = METHODS[1:] if scanned else METHODS
+        self.correlation = correlation_matrices(original_df, column_types, methods)
+        if scanned:
+            self.correlation["pearson"] = scan.correlation.matrix(numeric)
+        self.memorization = MemorizationIndex(self.column_types, pd.concat([scan.example_rows, scan.sample]))
+
+    @property
+    def columns(self):
+        return self.scan.columns
+
+    @property
+    def n_rows(self):
+        return self.scan.n_rows
+
+    @property
+    def head(self):
+        return self.scan.head
+
+    @property
+    def example_rows(self):
+        return self.scan.example_rows
+
+    @property
+    def sample(self):
+        return self.scan.sample
+
+    @property
+    def schema(self):
+        return Schema(self.column_types, self.n_rows)
+
+class ProfileStore:
+    """Directory of pickled profiles; least recently used files go once the directory exceeds max_bytes."""
+
+    def __init__(self, directory=PROFILE_DIR, max_bytes=PROFILE_CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def path(self, key):
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    def get(self, key):
+        path = self.path(key)
+        try:
+            with open(path, "rb") as f:
+                profile = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            return None
+        try:
+            os.utime(path)  # mtime doubles as the LRU clock
+        except FileNotFoundError:  # evicted by another process since the read; the profile is still good
+            pass
+        return profile
+
+    def put(self, profile):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path(profile.key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(profile, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        self.evict()
+
+    def evict(self):
+        with self._lock:
+            entries = []
+            for name in os.listdir(self.directory):
+                if name.endswith(".pkl"):
+                    try:
+                        stat = os.stat(os.path.join(self.directory, name))
+                    except FileNotFoundError:  # evicted by another process
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, name))
+            total = sum(size for _, size, _ in entries)
+            for _, size, name in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    pass
+                total -= size
+
+    def clear(self):
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if name.endswith(".pkl"):
+                    os.remove(os.path.join(self.directory, name))
+
+store = ProfileStore()
+
+def load_profile(data, schema=None, store=store):
+    """Profile for the uploaded bytes, read from the on-disk cache or built with one scan."""
+    key = profile_key(data, schema)
+    profile = store.get(key)
+    if profile is None:
+        profile = ReferenceProfile(key, scan_dataset(io.BytesIO(data)), schema)
+        store.put(profile)
+    return profile
@@ -0,0 +1,64 @@
+%%writefile schema.py
+import numpy as np
+import pandas as pd
+from pandas.api import types as ptypes
+
+PROBE_ROWS = 1000
+
+def normalize_columns(columns):
+    return [c.strip().replace(" ", "_").lower() for c in columns]
+
+def _integral(values):
+    values = np.asarray(values, dtype=float)
+    return bool(np.all(np.isfinite(values)) and np.all(np.mod(values, 1) == 0))
+
+def infer_column_type(series):
+    values = series.dropna()
+    if values.empty:
+        return str
+    if ptypes.is_bool_dtype(values) or ptypes.is_integer_dtype(values):
+        return int
+    if ptypes.is_float_dtype(values):
+        return int if _integral(values) else float
+    # Text columns almost always fail within the first rows; probing them first avoids
+    # coercing millions of strings just to find out.
+    if pd.to_numeric(values.iloc[:PROBE_ROWS], errors="coerce").isna().any():
+        return str
+    try:
+        numeric = values.astype("float64")
+    except (ValueError, TypeError):
+        numeric = pd.to_numeric(values, errors="coerce")
+        if numeric.isna().any():
+            return str
+    return int if _integral(numeric) else float
+
+class Schema:
+    """Column name -> python type (int, float or str), shared by generation and evaluation."""
+
+    def __init__(self, column_types, n_rows, sampled=False):
+        self.column_types = dict(column_types)
+        self.n_rows = n_rows
+        self.sampled = sampled
+
+    @property
+    def columns(self):
+        return list(self.column_types)
+
+    def numeric_columns(self):
+        return [c for c, t in self.column_types.items() if t in (int, float)]
+
+    def categorical_columns(self):
+        return [c for c, t in self.column_types.items() if t is str]
+
+    def __eq__(self, other):
+        return isinstance(other, Schema) and self.column_types == other.column_types
+
+    def __repr__(self):
+        types = ", ".join(f"{c}: {t.__name__}" for c, t in self.column_types.items())
+        return f"Schema({types}; rows={self.n_rows}{', sampled' if self.sampled else ''})"
+
+def infer_schema(df, sample_rows=None, seed=0):
+    """Vectorized type inference; with sample_rows set, only a bounded random sample is inspected."""
+    sampled = sample_rows is not None and len(df) > sample_rows
+    data = df.sample(sample_rows, random_state=seed) if sampled else df
+    return Schema({col: infer_column_type(data[col]) for col in df.columns}, len(df), sampled)
@@ -0,0 +1,136 @@
+%%writefile telemetry.py
+import cProfile
+import json
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+STAGES = ("setup", "prompt", "encode", "generate", "decode", "parse", "validate")
+
+class RunTelemetry:
+    """Per-stage wall time and counters for one generation run (or, merged, for a whole process)."""
+
+    def __init__(self):
+        self.seconds = defaultdict(float)
+        self.counters = defaultdict(int)
+        self.started = time.perf_counter()
+        self.finished = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name, seconds):
+        with self._lock:
+            self.seconds[name] += seconds
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] += n
+
+    def finish(self):
+        self.finished = time.perf_counter()
+        return self
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.perf_counter()) - self.started
+
+    def merge(self, other):
+        # other: a RunTelemetry, or the report() of one (e.g. sent back by a worker process)
+        seconds = other.seconds if isinstance(other, RunTelemetry) else other["stages"]
+        counters = other.counters if isinstance(other, RunTelemetry) else other["counters"]
+        with self._lock:
+            for name, value in seconds.items():
+                self.seconds[name] += value
+            for name, n in counters.items():
+                self.counters[name] += n
+            self.counters["runs"] += 1
+
+    def snapshot(self):
+        # Copies taken under the lock, so readers never iterate while merge() adds keys
+        with self._lock:
+            return dict(self.seconds), dict(self.counters)
+
+    def report(self):
+        elapsed = self.elapsed
+        seconds, counters = self.snapshot()
+        stages = {name: round(seconds.get(name, 0.0), 4) for name in STAGES}
+        stages.update({name: round(s, 4) for name, s in seconds.items() if name not in stages})
+        return {
+            "elapsed_seconds": round(elapsed, 4),
+            "stages": stages,
+            "other_seconds": round(max(elapsed - sum(seconds.values()), 0.0), 4),
+            "counters": counters,
+            "records_per_sec": round(counters.get("records", 0) / elapsed, 3) if elapsed > 0 else 0.0,
+        }
+
+    def write_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=2)
+
+    def prometheus(self, prefix="synthgen"):
+        seconds, counters = self.snapshot()
+        lines = [f"# HELP {prefix}_stage_seconds_total Wall time spent per generation stage.",
+                 f"# TYPE {prefix}_stage_seconds_total counter"]
+        lines += [f'{prefix}_stage_seconds_total{{stage="{name}"}} {seconds:.6f}'
+                  for name, seconds in sorted(seconds.items())]
+        for name, n in sorted(counters.items()):
+            lines += [f"# TYPE {prefix}_{name}_total counter", f"{prefix}_{name}_total {n}"]
+        return "\n".join(lines) + "\n"
+
+# Process-wide totals, fed by every finished run and served to Prometheus
+totals = RunTelemetry()
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip("/") != "/metrics":
+            self.send_error(404)
+            return
+        body = totals.prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def start_metrics_server(port=9108, host="127.0.0.1"):
+    """Serve `totals` at http://host:port/metrics from a daemon thread (loopback only unless host says otherwise)."""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+@contextmanager
+def capture_profile(mode, path):
+    """Profile the enclosed block: mode "cprofile" writes a .prof file, "torch" a Chrome trace."""
+    if not mode:
+        yield
+        return
+    if mode == "cprofile":
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            profiler.dump_stats(path)
+    elif mode == "torch":
+        import torch
+        activities = [torch.profiler.ProfilerActivity.CPU]
+        if torch.cuda.is_available():
+            activities.append(torch.profiler.ProfilerActivity.CUDA)
+        with torch.profiler.profile(activities=activities, record_shapes=True) as profiler:
+            yield
+        profiler.export_chrome_trace(path)
+    else:
+        raise ValueError(f"Unknown profile mode: {mode}")
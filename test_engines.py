@@ -0,0 +1,37 @@
+%%writefile test_engines.py
+import numpy as np
+import pandas as pd
+from engines import make_engine, generate_with_engine
+from memorization import MemorizationIndex
+from synthgen import load_csv_data
+
+def low_cardinality_frame(rows=20, seed=0):
+    # Few enough combinations that sampled rows are almost always copies of source rows
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({"Dept": rng.choice(["cardio", "radiology"], rows), "Sex": rng.choice(["m", "f"], rows),
+                         "Visits": rng.integers(0, 2, rows)})
+
+def copies(df, out):
+    source = df.copy()
+    _, column_types = load_csv_data(source, rng=np.random.default_rng(0))
+    kinds, _ = MemorizationIndex(column_types, source).match(out)
+    return int((kinds != "").sum())
+
+def test_hybrid_without_text_columns_rejects_copies():
+    df = low_cardinality_frame()
+    engine = make_engine("hybrid", df.copy(), memorization="reject")
+    assert engine.llm is None
+    out = pd.concat(list(engine.iter_frames(50, seed=1)) or [pd.DataFrame(columns=df.columns)], ignore_index=True)
+    assert copies(df, out) == 0
+
+def test_hybrid_without_text_columns_flags_copies():
+    df = low_cardinality_frame()
+    stats = {}
+    out = generate_with_engine("hybrid", df.copy(), 50, seed=1, stats=stats, memorization="flag")
+    assert len(out) == 50
+    assert len(stats["memorized"]) == copies(df, out) > 0
+
+def test_statistical_rejects_copies():
+    df = low_cardinality_frame()
+    out = generate_with_engine("statistical", df.copy(), 50, seed=1, memorization="reject")
+    assert copies(df, out) == 0
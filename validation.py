@@ -0,0 +1,95 @@
+%%writefile validation.py
+import numpy as np
+import pandas as pd
+from pandas.api import types as ptypes
+
+class ColumnarValidator:
+    """Validates a whole batch of parsed records at once, column by column.
+
+    Matches the pydantic path (DynamicModel plus the non-empty check) for what RecordParser
+    produces: int columns must hold integral numbers, float columns numbers, text columns
+    strings; a missing, null, NaN or blank value rejects the row as "empty_field", a value of
+    the wrong type as "invalid". (pydantic would let a float NaN through; the parser never
+    produces one.) Values the vectorized checks cannot decide exactly (mixed types in a
+    numeric column, bools, ints beyond int64, fractional values in an int column) fall back
+    to `fallback(row) -> (record, reason)`, i.e. pydantic, for the affected rows.
+    """
+
+    def __init__(self, column_types, fallback):
+        self.column_types = dict(column_types)
+        self.columns = list(self.column_types)
+        self.fallback = fallback
+
+    def _check_column(self, values, typ):
+        # -> (null, invalid, needs_fallback) boolean arrays
+        null = values.isna().to_numpy()
+        none = np.zeros(len(values), dtype=bool)
+        if typ in (int, float):
+            if ptypes.is_bool_dtype(values) or not ptypes.is_numeric_dtype(values):
+                return null, none, ~null
+            if typ is int and ptypes.is_float_dtype(values):
+                numbers = values.to_numpy()
+                with np.errstate(invalid="ignore"):
+                    integral = np.isfinite(numbers) & (np.mod(numbers, 1) == 0) & (np.abs(numbers) < 2 ** 63)
+                # Anything else may have been an exact Python int before the column became float64
+                return null, none, ~null & ~integral
+            return null, none, none
+        if ptypes.is_object_dtype(values) or ptypes.is_string_dtype(values):
+            try:
+                lengths = values.str.strip().str.len().to_numpy(dtype=float)
+            except AttributeError:  # no strings at all
+                lengths = np.full(len(values), np.nan)
+            not_str = ~null & np.isnan(lengths)
+            return null | (lengths == 0), not_str, none
+        return null, ~null, none
+
+    def validate(self, rows):
+        """Return (frame of accepted rows in input order, per-row status: "ok" or a reject reason)."""
+        status = np.array(["ok" if row else "unparsed" for row in rows], dtype=object)
+        positions = np.flatnonzero(status == "ok")
+        present = [rows[i] for i in positions]
+        try:
+            frame = pd.DataFrame.from_records(present, columns=self.columns)
+        except OverflowError:
+            # An int too large even for float64; keep raw objects so those columns use the fallback
+            frame = pd.DataFrame({col: pd.Series([row.get(col) for row in present], dtype=object)
+                                  for col in self.columns})
+        empty = np.zeros(len(frame), dtype=bool)
+        invalid = np.zeros(len(frame), dtype=bool)
+        fallback = np.zeros(len(frame), dtype=bool)
+        for col, typ in self.column_types.items():
+            null, bad, other = self._check_column(frame[col], typ)
+            empty |= null
+            invalid |= bad
+            fallback |= other
+        fallback &= ~invalid
+        status[positions[invalid]] = "invalid"
+        status[positions[empty & ~invalid & ~fallback]] = "empty_field"
+        accepted = ~(invalid | empty | fallback)
+        fallback_records = {}
+        for i in np.flatnonzero(fallback):
+            record, reason = self.fallback(rows[positions[i]])
+            if record is None:
+                status[positions[i]] = reason
+            else:
+                fallback_records[i] = record
+        frame = self._coerce(frame[accepted].copy())
+        if fallback_records:
+            extra = pd.DataFrame(list(fallback_records.values()), index=list(fallback_records), columns=self.columns)
+            frame = self._coerce(pd.concat([frame, extra]).sort_index())
+        return frame.reset_index(drop=True), status
+
+    def _coerce(self, frame):
+        # Same value types as DynamicModel(...).model_dump(): ints as int, floats as float
+        for col, typ in self.column_types.items():
+            values = frame[col]
+            if typ is int and ptypes.is_float_dtype(values):
+                frame[col] = values.astype("int64")
+            elif typ is float and not ptypes.is_float_dtype(values):
+                frame[col] = values.astype("float64")
+        return frame
+
+def frame_records(frame):
+    """Rows as dicts of plain Python values; much cheaper than DataFrame.to_dict("records")."""
+    columns = list(frame.columns)
+    return [dict(zip(columns, row)) for row in zip(*(frame[col].tolist() for col in columns))]
@@ -0,0 +1,81 @@
+%%writefile worker_pool.py
+import os
+import resource
+import time
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+import torch
+from model_registry import DEFAULT_BACKEND, DEFAULT_MODEL, get_model
+from engines import make_engine
+from validation import frame_records
+
+_worker = {}
+
+def shard_seed(seed, index):
+    if seed is None:
+        return None
+    return int(np.random.SeedSequence([seed, index]).generate_state(1)[0])
+
+def peak_rss_bytes():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def _init_worker(df, gen_kwargs, threads):
+    torch.set_num_threads(threads)
+    gen_kwargs = dict(gen_kwargs)
+    engine = gen_kwargs.pop("engine", "llm")
+    _worker["engine"] = make_engine(engine, df, **gen_kwargs)
+    if engine != "statistical":
+        get_model(gen_kwargs.get("model_name", DEFAULT_MODEL), backend=gen_kwargs.get("backend", DEFAULT_BACKEND))
+
+def _run_shard(index, rows, seed):
+    start = time.perf_counter()
+    stats = {}
+    records = [record for frame in _worker["engine"].iter_frames(rows, seed=seed, stats=stats)
+               for record in frame_records(frame)]
+    return {"index": index, "records": records, "seconds": time.perf_counter() - start,
+            "pid": os.getpid(), "peak_rss": peak_rss_bytes(), "telemetry": stats["telemetry"]}
+
+class GenerationPool:
+    """Process pool whose workers each load the model once, with a pinned torch thread count."""
+
+    def __init__(self, df, workers=2, threads_per_worker=None, **gen_kwargs):
+        self.workers = workers
+        self.threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 1) // workers)
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=mp.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(df, gen_kwargs, self.threads_per_worker),
+        )
+
+    def submit(self, index, rows, seed=None):
+        return self._executor.submit(_run_shard, index, rows, seed)
+
+    def close(self):
+        self._executor.shutdown(cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def generate_parallel(df, num_samples, workers=2, threads_per_worker=None, shard_size=None, seed=None,
+                      stats=None, **gen_kwargs):
+    shard_size = shard_size or -(-num_samples // workers)
+    shards = [(i, min(shard_size, num_samples - start)) for i, start in enumerate(range(0, num_samples, shard_size))]
+    results = {}
+    with GenerationPool(df, workers, threads_per_worker, **gen_kwargs) as pool:
+        futures = [pool.submit(index, rows, shard_seed(seed, index)) for index, rows in shards]
+        for future in as_completed(futures):
+            result = future.result()
+            results[result["index"]] = result
+    if stats is not None:
+        peaks = {}
+        for result in results.values():
+            peaks[result["pid"]] = max(peaks.get(result["pid"], 0), result["peak_rss"])
+        stats["peak_rss_per_worker"] = peaks
+        stats["shard_seconds"] = {i: round(r["seconds"], 2) for i, r in results.items()}
+    return pd.DataFrame([record for i in sorted(results) for record in results[i]["records"]])